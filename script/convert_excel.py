@@ -1,22 +1,40 @@
+import csv
 import os
 import pandas as pd
 from pathlib import Path
-from io import StringIO
+
+# Signatures des fichiers Excel : xlsx (archive zip) et xls (OLE2)
+EXCEL_SIGNATURES = (b'PK\x03\x04', b'\xd0\xcf\x11\xe0')
+
+
+def _is_excel_file(input_file):
+    with open(input_file, 'rb') as f:
+        return f.read(4) in EXCEL_SIGNATURES
+
 
 def convert_excel_to_standard_csv(input_file):
-    # Lire le fichier Excel (même si l'extension est .csv)
-    df_excel = pd.read_excel(input_file, header=None)
-    # Extraire la première colonne (qui contient tout le CSV sous forme de texte)
-    csv_text = "\n".join(df_excel.iloc[:, 0].dropna().astype(str))
-    # Parser ce texte comme un vrai CSV
-    df = pd.read_csv(StringIO(csv_text))
-    # Sauvegarder le CSV propre
     output_file = input_file.replace('.csv', '_converted.csv')
-    df.to_csv(output_file, index=False)
+    with open(output_file, 'w', newline='', encoding='utf-8') as out:
+        if _is_excel_file(input_file):
+            # Lire le fichier Excel (même si l'extension est .csv)
+            df_excel = pd.read_excel(input_file, header=None)
+            # La première colonne contient chaque ligne du CSV sous forme de texte
+            for line in df_excel.iloc[:, 0].dropna().astype(str):
+                out.write(line + '\n')
+        else:
+            # Fichier texte : recopier ligne par ligne, sans passer par Excel
+            writer = csv.writer(out)
+            with open(input_file, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if len(row) == 1:
+                        # Ligne CSV entourée de guillemets dans une seule colonne
+                        out.write(row[0] + '\n')
+                    elif row:
+                        writer.writerow(row)
     return output_file
 
 if __name__ == "__main__":
     # Example usage
     input_file = 'data/raw/2025-05.csv'
     converted_file = convert_excel_to_standard_csv(input_file)
-    print(f"Fichier converti sauvegardé dans : {converted_file}") 
\ No newline at end of file
+    print(f"Fichier converti sauvegardé dans : {converted_file}")
@@ -1,11 +1,22 @@
 """
 Main dashboard application
 """
+import threading
+
 import dash
 import dash_bootstrap_components as dbc
 
 from .layouts import create_main_layout
 from .callbacks import register_callbacks
+from ..utilities.data_loader import load_categorized_expenses
+
+
+def _preload_data():
+    """Load the categorized expenses so that the first callbacks find them cached"""
+    try:
+        load_categorized_expenses()
+    except Exception as e:
+        print(f"Warning: could not preload expenses: {e}")
 
 
 def create_app():
@@ -15,7 +26,9 @@ def create_app():
                         dbc.themes.BOOTSTRAP,
                         "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"
                     ],
-                    suppress_callback_exceptions=True)
+                    suppress_callback_exceptions=True,
+                    # Keep the tab title during callbacks (no "Updating..." rewrite per round-trip)
+                    update_title=None)
     
     # Custom CSS for enhanced styling
     app.index_string = '''
@@ -133,6 +146,10 @@ def create_app():
     # Register callbacks
     register_callbacks(app)
     
+    # Load data in the background while the server starts: callbacks that
+    # arrive before it is done wait for the same load instead of starting another
+    threading.Thread(target=_preload_data, daemon=True).start()
+    
     return app
 
 
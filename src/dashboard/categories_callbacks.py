@@ -1,15 +1,178 @@
 """
 Category analysis callbacks for the dashboard
 """
-import plotly.graph_objects as go
-from dash import Input, Output, html
+from functools import lru_cache
+from itertools import islice
+
+from dash import Input, Output, State, html, no_update
 import pandas as pd
 
 from ..utilities.data_loader import (
-    load_config, load_all_processed_data, get_main_category,
-    get_subtags_for_category, get_monthly_trend, get_latest_month, get_month_data,
-    get_available_months, get_last_completed_month, get_completed_months
+    load_categorized_expenses, get_month_slices, get_subtags_by_category,
+    get_monthly_trends, get_latest_month, get_available_months,
+    load_completed_months, get_data_version
 )
+from .layouts import create_figure
+
+
+def _create_trend_figure(title: str, name: str = '', months=None, amounts=None) -> dict:
+    """Create the monthly evolution figure
+    
+    The figure always holds exactly one line trace (empty without data) so
+    that plotly.js updates it in place instead of rebuilding the chart.
+    """
+    return create_figure(
+        data=[dict(
+            type='scattergl',
+            x=months if months is not None else [],
+            y=amounts if amounts is not None else [],
+            mode='lines+markers',
+            name=name,
+            line=dict(width=3, color='#FF6B6B'),
+            marker=dict(size=10)
+        )],
+        title=title,
+        xaxis_title="Month",
+        yaxis_title="Amount (€)",
+        margin=dict(t=40, b=40, l=40, r=40),
+        showlegend=False
+    )
+
+
+# Shown until a category is clicked: built once, returned as is
+EMPTY_TREND_FIGURE = _create_trend_figure("Monthly evolution (click on a category)")
+NO_CATEGORY_INFO = html.P("Select a category in the pie chart to see details")
+EMPTY_TREND_DATA = pd.DataFrame({'month': pd.Series(dtype=str), 'amount_abs': pd.Series(dtype=float)})
+
+
+@lru_cache(maxsize=2)
+def _get_month_slices(data_version: tuple) -> dict:
+    """Get the rows of every month of the history, split once per data version"""
+    all_data = load_categorized_expenses()
+    return get_month_slices(all_data) if not all_data.empty else {}
+
+
+def _load_categorized_data(selected_month: str, data_version: tuple) -> tuple:
+    """Load the selected month and the full history with main categories
+    
+    The expenses file is read once: the month is looked up in the slices
+    built for the data version. The returned DataFrames are shared between
+    callbacks and must not be modified.
+    """
+    all_data = load_categorized_expenses()
+    current_month_data = _get_month_slices(data_version).get(selected_month, all_data.iloc[:0])
+    return current_month_data, all_data
+
+
+@lru_cache(maxsize=2)
+def _get_monthly_category_stats(data_version: tuple) -> pd.DataFrame:
+    """Get the total amount and number of transactions per month and main category
+    
+    One groupby over the whole history, indexed by (month, main_category) and
+    cached per data version: switching months only slices it.
+    """
+    all_data = load_categorized_expenses()
+    
+    # Group by month and category and calculate sums and counts in one pass
+    category_cents = all_data.groupby(['month', 'main_category'], observed=True)['amount_cents'].agg(['sum', 'size'])
+    return pd.DataFrame({
+        'amount_abs': category_cents['sum'] / 100,
+        'nb_transactions': category_cents['size']
+    })
+
+
+@lru_cache(maxsize=32)
+def _get_category_stats(selected_month: str, data_version: tuple) -> pd.DataFrame:
+    """Get the month's total amount and number of transactions per main category
+    
+    Indexed by main category, sorted by decreasing amount and cached per data version.
+    """
+    monthly_stats = _get_monthly_category_stats(data_version)
+    try:
+        category_stats = monthly_stats.loc[selected_month]
+    except KeyError:
+        category_stats = monthly_stats.iloc[:0].droplevel('month')
+    return category_stats.sort_values('amount_abs', ascending=False)
+
+
+@lru_cache(maxsize=2)
+def _get_category_trends(data_version: tuple) -> dict:
+    """Get the monthly evolution of every category, cached per data version for every selected month"""
+    all_data = load_categorized_expenses()
+    return get_monthly_trends(all_data) if not all_data.empty else {}
+
+
+@lru_cache(maxsize=32)
+def _get_month_subtags(selected_month: str, data_version: tuple) -> dict:
+    """Get the subtags of every category of the month, sorted by decreasing amount and cached per data version"""
+    current_month_data, _ = _load_categorized_data(selected_month, data_version)
+    return get_subtags_by_category(current_month_data)
+
+
+@lru_cache(maxsize=128)
+def _get_category_details(selected_month: str, category: str, data_version: tuple) -> tuple:
+    """Get (subtags, total_amount, nb_transactions) for a category, cached per data version"""
+    subtags = _get_month_subtags(selected_month, data_version).get(category, {})
+    
+    category_stats = _get_category_stats(selected_month, data_version)
+    if category in category_stats.index:
+        total_current = category_stats.at[category, 'amount_abs']
+        nb_transactions = int(category_stats.at[category, 'nb_transactions'])
+    else:
+        total_current, nb_transactions = 0.0, 0
+    
+    return subtags, total_current, nb_transactions
+
+
+@lru_cache(maxsize=64)
+def _build_trend_figure(category: str, data_version: tuple) -> dict:
+    """Build a category's monthly evolution figure, cached per data version for every selected month"""
+    monthly_data = _get_category_trends(data_version).get(category, EMPTY_TREND_DATA)
+    if monthly_data.empty:
+        return _create_trend_figure(f"No historical data for '{category}'", category)
+    
+    return _create_trend_figure(
+        f"Monthly Evolution - {category}", category,
+        monthly_data['month'].to_numpy(), monthly_data['amount_abs'].to_numpy()
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_pie_chart(selected_month: str, data_version: tuple) -> tuple:
+    """Build the month's pie chart and subtags store data, cached per data version"""
+    category_stats = _get_category_stats(selected_month, data_version)
+    if category_stats.empty:
+        return {}, None
+    
+    # Top 10 subtags of every category, as columns {'names': [...], 'amounts': [...]}.
+    # Subtags are already sorted by decreasing amount: only the first 10 items are read
+    month_subtags = _get_month_subtags(selected_month, data_version)
+    subtags_data = {'month': selected_month, 'subtags': {}}
+    for category in category_stats.index:
+        top_subtags = list(islice(month_subtags.get(category, {}).items(), 10))
+        subtags_data['subtags'][category] = {
+            'names': [name for name, _ in top_subtags],
+            'amounts': [amount for _, amount in top_subtags]
+        }
+    
+    # Create the pie chart
+    fig = create_figure(
+        data=[dict(
+            type='pie',
+            labels=category_stats.index.to_numpy(),
+            values=category_stats['amount_abs'].to_numpy(),
+            hole=0.3,
+            textinfo='label+percent',
+            textposition='auto',
+            hovertemplate='<b>%{label}</b><br>Amount: %{value:.2f}€<br>Percentage: %{percent}<extra></extra>'
+        )],
+        title=f"Expenses by Category ({selected_month})",
+        showlegend=True,
+        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
+        margin=dict(t=40, b=40, l=40, r=40)
+    )
+    
+    return fig, subtags_data
 
 
 def register_categories_callbacks(app):
@@ -28,8 +191,9 @@ def register_categories_callbacks(app):
         
         try:
             months = get_available_months()
-            # Mark completed months with checkmark
-            completed_months = get_completed_months()
+            # Mark completed months with checkmark (completed_months.json is read once)
+            completed_config = load_completed_months()
+            completed_months = completed_config.get("completed_months", [])
             options = []
             for month in months:
                 if month in completed_months:
@@ -38,7 +202,7 @@ def register_categories_callbacks(app):
                     options.append({'label': month, 'value': month})
             
             # Default to last completed month, or latest available if none completed
-            default_value = get_last_completed_month()
+            default_value = completed_config.get("last_completed")
             if not default_value and months:
                 default_value = months[0]
             
@@ -48,190 +212,130 @@ def register_categories_callbacks(app):
             return [], None
 
     @app.callback(
-        Output('pie-chart', 'figure'),
+        [Output('pie-chart', 'figure'),
+         Output('subtags-store', 'data')],
         [Input('month-selector', 'value'),
          Input('refresh-visualizations-store', 'data')]
     )
     def create_pie_chart(selected_month, refresh_trigger):
-        """Create pie chart for category analysis"""
+        """Create pie chart for category analysis and publish the month's subtags"""
         if not selected_month:
-            return {}
+            return {}, None
         
         # Load month data dynamically
         try:
-            main_categories = load_config('main_categories.json')
-            current_month_data = get_month_data(selected_month)
-            
-            # Apply main categories
-            current_month_data['main_category'] = current_month_data['parsed_tags'].apply(
-                lambda tags: get_main_category(tags, main_categories)
-            )
-            
+            return _build_pie_chart(selected_month, get_data_version())
         except Exception as e:
             print(f"Error loading data: {e}")
-            return {}
-        
-        if current_month_data.empty:
-            return {}
-        
-        # Group by category and calculate sums
-        category_amounts = current_month_data.groupby('main_category')['amount_abs'].sum().reset_index()
-        category_amounts = category_amounts.sort_values('amount_abs', ascending=False)
-        
-        # Create the pie chart
-        fig = go.Figure(data=[go.Pie(
-            labels=category_amounts['main_category'],
-            values=category_amounts['amount_abs'],
-            hole=0.3,
-            textinfo='label+percent',
-            textposition='auto',
-            hovertemplate='<b>%{label}</b><br>Amount: %{value:.2f}€<br>Percentage: %{percent}<extra></extra>'
-        )])
-        
-        fig.update_layout(
-            title=f"Expenses by Category ({selected_month})",
-            showlegend=True,
-            legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
-            margin=dict(t=40, b=40, l=40, r=40)
-        )
-        
-        return fig
+            return {}, None
+
+    # Subtags chart is built in the browser from the subtags store: a click on
+    # the pie chart does not need a server round-trip
+    app.clientside_callback(
+        """
+        function(clickData, subtagsData, pieFigure) {
+            if (!subtagsData) {
+                return {};
+            }
+            const layout = {
+                xaxis: {title: {text: 'Subtags'}},
+                yaxis: {title: {text: 'Amount (€)'}},
+                margin: {t: 40, b: 40, l: 40, r: 40},
+                template: pieFigure && pieFigure.layout ? pieFigure.layout.template : undefined
+            };
+            // Always exactly one bar trace (empty without data) so that plotly.js
+            // updates it in place instead of rebuilding the chart
+            const category = clickData ? clickData.points[0].label : null;
+            const subtags = (category && subtagsData.subtags[category]) || {names: [], amounts: []};
+            if (!category) {
+                layout.title = {text: 'Subtags breakdown (click on a category)'};
+            } else if (subtags.names.length === 0) {
+                layout.title = {text: `No subtags for '${category}'`};
+            } else {
+                layout.title = {text: `Subtags of '${category}' (${subtagsData.month})`};
+                layout.xaxis.tickangle = 45;
+            }
+            return {
+                data: [{
+                    type: 'bar',
+                    x: subtags.names,
+                    y: subtags.amounts,
+                    marker: {color: '#45B7D1'},
+                    texttemplate: '%{y:.0f}€',
+                    textposition: 'auto'
+                }],
+                layout: layout
+            };
+        }
+        """,
+        Output('subtags-bar', 'figure'),
+        [Input('pie-chart', 'clickData'),
+         Input('subtags-store', 'data')],
+        [State('pie-chart', 'figure')]
+    )
 
     @app.callback(
-        [Output('subtags-bar', 'figure'),
-         Output('monthly-trend', 'figure'),
-         Output('category-info', 'children')],
+        [Output('monthly-trend', 'figure'),
+         Output('category-info', 'children'),
+         Output('secondary-charts-key', 'data')],
         [Input('pie-chart', 'clickData'),
          Input('month-selector', 'value'),
-         Input('refresh-visualizations-store', 'data')]
+         Input('refresh-visualizations-store', 'data')],
+        [State('secondary-charts-key', 'data')]
     )
-    def update_secondary_charts(clickData, selected_month, refresh_trigger):
-        """Update secondary charts when category is clicked"""
+    def update_secondary_charts(clickData, selected_month, refresh_trigger, shown_key):
+        """Update monthly trend and details when category is clicked"""
         if not selected_month:
-            return {}, {}, []
+            return {}, [], None
         
-        # Load data dynamically
+        # Load data dynamically: the month's per-category stats are all that
+        # is needed to know whether it has expenses
         try:
-            main_categories = load_config('main_categories.json')
-            current_month_data = get_month_data(selected_month)
-            
-            # Apply main categories
-            current_month_data['main_category'] = current_month_data['parsed_tags'].apply(
-                lambda tags: get_main_category(tags, main_categories)
-            )
-            
-            # Load all data for trend analysis
-            all_data = load_all_processed_data()
-            if not all_data.empty:
-                all_data['main_category'] = all_data['parsed_tags'].apply(
-                    lambda tags: get_main_category(tags, main_categories)
-                )
+            data_version = get_data_version()
+            category_stats = _get_category_stats(selected_month, data_version)
                 
         except Exception as e:
             print(f"Error loading data for secondary charts: {e}")
-            return {}, {}, []
-        
-        if current_month_data.empty:
-            return {}, {}, []
+            return {}, [], None
         
-        if not clickData:
-            # Default empty charts
-            empty_bar = go.Figure()
-            empty_bar.update_layout(
-                title="Subtags breakdown (click on a category)",
-                xaxis_title="Subtags",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40)
-            )
-            
-            empty_line = go.Figure()
-            empty_line.update_layout(
-                title="Monthly evolution (click on a category)",
-                xaxis_title="Month",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40)
-            )
-            
-            info_text = html.P("Select a category in the pie chart to see details")
-            
-            return empty_bar, empty_line, info_text
+        if category_stats.empty:
+            return {}, [], None
         
         # Get clicked category
-        category = clickData['points'][0]['label']
+        category = clickData['points'][0]['label'] if clickData else None
         
-        # 1. Subtags chart
-        subtags = get_subtags_for_category(category, current_month_data)
+        # Clicking the shown category again changes nothing: skip sending it back
+        charts_key = repr((selected_month, category, data_version))
+        if charts_key == shown_key:
+            return no_update, no_update, no_update
         
-        if subtags:
-            subtag_names = list(subtags.keys())[:10]  # Top 10
-            subtag_amounts = [subtags[name] for name in subtag_names]
-            
-            bar_fig = go.Figure(data=[go.Bar(
-                x=subtag_names,
-                y=subtag_amounts,
-                marker_color='#45B7D1',
-                text=[f'{amt:.0f}€' for amt in subtag_amounts],
-                textposition='auto'
-            )])
-            
-            bar_fig.update_layout(
-                title=f"Subtags of '{category}' ({selected_month})",
-                xaxis_title="Subtags",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40),
-                xaxis={'tickangle': 45}
-            )
-        else:
-            bar_fig = go.Figure()
-            bar_fig.update_layout(
-                title=f"No subtags for '{category}'",
-                xaxis_title="Subtags",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40)
-            )
+        if category is None:
+            # Default empty chart
+            return EMPTY_TREND_FIGURE, NO_CATEGORY_INFO, charts_key
         
-        # 2. Monthly evolution
-        monthly_data = get_monthly_trend(category, all_data)
+        subtags, total_current, nb_transactions = _get_category_details(
+            selected_month, category, data_version
+        )
         
-        if not monthly_data.empty:
-            line_fig = go.Figure(data=[go.Scatter(
-                x=monthly_data['month'],
-                y=monthly_data['amount_abs'],
-                mode='lines+markers',
-                name=category,
-                line=dict(width=3, color='#FF6B6B'),
-                marker=dict(size=10)
-            )])
-            
-            line_fig.update_layout(
-                title=f"Monthly Evolution - {category}",
-                xaxis_title="Month",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40),
-                showlegend=False
-            )
-        else:
-            line_fig = go.Figure()
-            line_fig.update_layout(
-                title=f"No historical data for '{category}'",
-                xaxis_title="Month",
-                yaxis_title="Amount (€)",
-                margin=dict(t=40, b=40, l=40, r=40)
-            )
+        # 1. Monthly evolution
+        line_fig = _build_trend_figure(category, data_version)
         
-        # 3. Detailed information
-        total_current = current_month_data[current_month_data['main_category'] == category]['amount_abs'].sum()
-        nb_transactions = len(current_month_data[current_month_data['main_category'] == category])
+        # 2. Detailed information
+        info_lines = [
+            f"💰 Total amount ({selected_month}): {total_current:.2f}€",
+            f"📝 Number of transactions: {nb_transactions}",
+        ]
         
+        if subtags:
+            info_lines.append(f"🏷️ Number of subtags: {len(subtags)}")
+            # Subtags are sorted by decreasing amount: the main one comes first
+            top_subtag, top_amount = next(iter(subtags.items()))
+            info_lines.append(f"🥇 Main subtag: {top_subtag} ({top_amount:.0f}€)")
+        
+        # One text component for all lines, rendered on separate lines
         info_components = [
             html.H4(f"📊 Details - {category}", className="text-primary"),
-            html.P(f"💰 Total amount ({selected_month}): {total_current:.2f}€"),
-            html.P(f"📝 Number of transactions: {nb_transactions}"),
+            html.P("\n".join(info_lines), style={'whiteSpace': 'pre-line'}),
         ]
         
-        if subtags:
-            info_components.append(html.P(f"🏷️ Number of subtags: {len(subtags)}"))
-            top_subtag = max(subtags, key=subtags.get)
-            info_components.append(html.P(f"🥇 Main subtag: {top_subtag} ({subtags[top_subtag]:.0f}€)"))
-        
-        return bar_fig, line_fig, info_components 
\ No newline at end of file
+        return line_fig, info_components, charts_key 
\ No newline at end of file
@@ -2,8 +2,24 @@
 Dashboard layouts and UI components
 """
 import dash_bootstrap_components as dbc
+import plotly.io as pio
 from dash import dcc, html, dash_table
 
+# Default plotly template, converted once so that figures are built as plain dicts
+FIGURE_TEMPLATE = pio.templates['plotly'].to_plotly_json()
+
+
+def create_figure(data=None, title=None, xaxis_title=None, yaxis_title=None, **layout):
+    """Create a plotly figure dict without going through graph_objects validation"""
+    if title is not None:
+        layout['title'] = {'text': title}
+    if xaxis_title is not None:
+        layout['xaxis'] = {**layout.get('xaxis', {}), 'title': {'text': xaxis_title}}
+    if yaxis_title is not None:
+        layout['yaxis'] = {**layout.get('yaxis', {}), 'title': {'text': yaxis_title}}
+    layout['template'] = FIGURE_TEMPLATE
+    return {'data': data or [], 'layout': layout}
+
 
 def create_tag_cloud(tags_options, selected_tags=None):
     """Create a responsive tag cloud with clickable badges"""
@@ -127,13 +143,17 @@ def create_categories_layout():
         dbc.Row([
             # Main pie chart
             dbc.Col([
-                dcc.Graph(id='pie-chart', style={'height': '600px'})
+                dcc.Graph(id='pie-chart', style={'height': '600px'}),
+                # Subtags of every category of the month, read by the subtags chart in the browser
+                dcc.Store(id='subtags-store')
             ], width=6),
             
             # Secondary charts
             dbc.Col([
                 dcc.Graph(id='subtags-bar', style={'height': '300px'}),
-                dcc.Graph(id='monthly-trend', style={'height': '300px'})
+                dcc.Graph(id='monthly-trend', style={'height': '300px'}),
+                # Key of the (month, category, data) shown by the trend chart and info zone
+                dcc.Store(id='secondary-charts-key')
             ], width=6)
         ]),
         
@@ -229,6 +249,8 @@ def create_interactive_tagging_layout():
                     ]),
                     dbc.CardBody([
                         html.P("Click on a transaction to select it for tagging", className="text-muted mb-3"),
+                        # The cards are rendered in the browser from the transactions in the store
+                        dcc.Store(id='transaction-details-store'),
                         html.Div(id='transaction-details', style={'maxHeight': '300px', 'overflowY': 'auto'})
                     ])
                 ], className="mb-3"),
@@ -266,11 +288,18 @@ def create_interactive_tagging_layout():
                         html.H5("🔸 STEP 3: Apply Tags", className="mb-0 text-success")
                     ]),
                     dbc.CardBody([
+                        # Both views are always mounted: the selection only toggles
+                        # which one is displayed (see the tagging callbacks)
                         html.Div(id='tagging-panel-content', children=[
                             html.Div([
                                 html.I(className="fas fa-hand-pointer fa-2x text-muted"),
-                                html.P("Select a transaction to start tagging", className="text-muted mt-2 mb-0")
-                            ], className="text-center py-4")
+                                html.P("Select vendors or transactions to start tagging", className="text-muted mt-2 mb-0")
+                            ], id='tagging-panel-placeholder', className="text-center py-4"),
+                            html.Div([
+                                html.Div(id='tag-cloud-container', className="mb-3"),
+                                dbc.Input(id='new-tags-input', placeholder='Enter new tags, comma-separated...', className="mb-3"),
+                                dbc.Button("Apply Tags", id='apply-tags-btn', color="primary", className="w-100")
+                            ], id='tagging-panel-form', style={'display': 'none'})
                         ])
                     ])
                 ], className="mb-3"),
@@ -1,27 +1,222 @@
 """
 Tagging workflow callbacks for the dashboard
 """
-from dash import Input, Output, html, dash_table, State, ctx as ctx, ALL, dcc
+from functools import lru_cache
+from itertools import chain
+
+from dash import Input, Output, html, dash_table, State, ctx as ctx, ALL, dcc, no_update
 import pandas as pd
 from datetime import datetime
+from dateutil.relativedelta import relativedelta
 import json
 import dash_bootstrap_components as dbc
 from dash.exceptions import PreventUpdate
 
 from .layouts import create_interactive_tagging_layout, create_tag_cloud
 from ..utilities.data_loader import (
-    get_raw_files, preprocess_raw_file, load_tagging_configs,
+    get_raw_files, get_raw_files_signature, get_raw_file_version, preprocess_raw_file, load_tagging_configs,
     get_untagged_vendors_from_df, get_suggested_tags_for_vendors,
     get_transaction_details_for_vendors, apply_tags_to_vendors,
     apply_tags_to_transaction, apply_tags_to_transactions, get_daily_context_for_transaction,
-    get_tagging_progress, save_tagged_file, update_configurations_on_disk,
-    restore_dataframe_from_store, prepare_dataframe_for_store,
+    get_tagging_progress, get_untagged_mask, save_tagged_file, update_configurations_on_disk,
+    restore_dataframe_from_store, prepare_dataframe_for_store, DataFrameExpiredError,
     remove_transactions_from_raw, get_remaining_raw_count,
     mark_month_as_completed, save_expenses,
     spread_transaction_over_months
 )
 
 
+TRANSACTION_CARD_STYLE = {
+    'border': '1px solid #dee2e6', 'border-radius': '8px',
+    'transition': 'all 0.2s ease', 'cursor': 'pointer'
+}
+SELECTED_TRANSACTION_CARD_STYLE = {
+    'border': '2px solid #007bff', 'border-radius': '8px',
+    'background-color': '#e7f3ff', 'transition': 'all 0.2s ease',
+    'cursor': 'pointer', 'transform': 'scale(1.02)'
+}
+
+# Feedback that doesn't depend on the callback input: built once, returned as is
+NO_TAGS_ALERT = dbc.Alert("No tags selected or entered.", color="warning")
+NO_TRANSACTIONS_TAGGED_ALERT = dbc.Alert("⚠️ No transactions were tagged (they may already be tagged).", color="warning")
+NO_UNTAGGED_VENDOR_TRANSACTIONS_ALERT = dbc.Alert("⚠️ No untagged transactions found for the selected vendor(s).", color="warning")
+NO_SELECTION_ALERT = dbc.Alert("Select vendors or transactions first.", color="info")
+EXPIRED_DATAFRAME_ALERT = dbc.Alert(
+    "⚠️ The file being tagged is no longer loaded. Please select it again in the raw files list.",
+    color="warning",
+    dismissable=True
+)
+
+
+@lru_cache(maxsize=8)
+def _preprocess_raw_file(filename: str, raw_file_version: tuple) -> tuple:
+    """Preprocess a raw file and load the tagging configurations, cached per raw file version
+    
+    Selecting the same file again is served from memory until the file or the
+    tagging configuration changes (see get_raw_file_version). The returned
+    objects are shared between calls and must not be modified.
+    """
+    expenses_df, summary_info, untagged_summary = preprocess_raw_file(filename)
+    tags, vendor_tags = load_tagging_configs()
+    return expenses_df, summary_info, untagged_summary, tags, vendor_tags
+
+
+@lru_cache(maxsize=4)
+def _build_raw_files_display(raw_files_signature: tuple):
+    """Build the raw files table, cached per raw files signature
+    
+    The table is only rebuilt once a raw file is added, removed or rewritten
+    (see get_raw_files_signature), not on every visit of the tagging tab.
+    """
+    raw_files = get_raw_files()
+    
+    if not raw_files:
+        return html.Div([
+            html.P("No raw files found in data/raw/ directory", className="text-muted"),
+            html.P("Place your Revolut CSV files in the data/raw/ folder to start tagging", 
+                  className="text-info")
+        ])
+    
+    # Create a table with file information (size in MB, modification date to the minute)
+    table_data = [
+        {
+            'filename': file_info['filename'],
+            'rows': file_info['num_rows'] if file_info['readable'] else 'Error',
+            'size': f"{file_info['size'] / (1024 * 1024):.2f} MB",
+            'modified': f"{datetime.fromtimestamp(file_info['modified']):%Y-%m-%d %H:%M}",
+            'status': 'Ready' if file_info['readable'] else 'Error'
+        }
+        for file_info in raw_files
+    ]
+    
+    return html.Div([
+        dash_table.DataTable(
+            id='raw-files-table',
+            columns=[
+                {"name": "📄 File Name", "id": "filename"},
+                {"name": "📊 Rows", "id": "rows"},
+                {"name": "💾 Size", "id": "size"},
+                {"name": "📅 Modified", "id": "modified"},
+                {"name": "🔍 Status", "id": "status"}
+            ],
+            data=table_data,
+            style_cell={'textAlign': 'left'},
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{status} = Error'},
+                    'backgroundColor': '#ffebee',
+                    'color': 'black',
+                },
+                {
+                    'if': {'filter_query': '{status} = Ready'},
+                    'backgroundColor': '#e8f5e8',
+                    'color': 'black',
+                }
+            ],
+            style_header={
+                'backgroundColor': '#f8f9fa',
+                'fontWeight': 'bold'
+            },
+            row_selectable='single',
+            selected_rows=[],
+            page_size=10
+        ),
+        html.P(f"Found {len(raw_files)} raw file(s)", className="text-muted mt-2")
+    ])
+
+
+def _restore_dataframe(df_data, copy: bool = False):
+    """Restore the DataFrame being tagged, or leave the outputs as they are if it expired
+    
+    Also keeps the cached helpers below from caching anything for an expired
+    key: the exception goes through lru_cache.
+    """
+    try:
+        return restore_dataframe_from_store(df_data, copy=copy)
+    except DataFrameExpiredError as e:
+        print(f"Warning: {e}")
+        raise PreventUpdate
+
+
+@lru_cache(maxsize=8)
+def _get_untagged_vendors(df_key: str, known_vendors: frozenset) -> list:
+    """Get the untagged vendors of a stored DataFrame, cached per store key
+    
+    A stored DataFrame is never modified (tagging stores a new one under a
+    new key), so selecting vendor cards reuses the list instead of grouping
+    the transactions again. The returned list must not be modified.
+    """
+    df = _restore_dataframe(df_key)
+    return get_untagged_vendors_from_df(df, dict.fromkeys(known_vendors))
+
+
+@lru_cache(maxsize=8)
+def _get_tagging_progress(df_key: str) -> dict:
+    """Get the tagging progress of a stored DataFrame, cached per store key
+    
+    Shared by the progress display and the save callback, which read the
+    same stored DataFrame. The returned dict must not be modified.
+    """
+    return get_tagging_progress(_restore_dataframe(df_key))
+
+
+@lru_cache(maxsize=32)
+def _get_daily_context(df_key: str, transaction_id: str) -> dict:
+    """Get the transactions of the selected transaction's day, cached per store key
+    
+    Selecting a transaction again (or going back to it) reuses the day
+    instead of scanning the stored DataFrame. The returned dict must not be
+    modified.
+    """
+    return get_daily_context_for_transaction(_restore_dataframe(df_key), transaction_id)
+
+
+def _build_progress_display(progress_info):
+    """Build the tagging progress bar and amounts"""
+    # Calculate progress percentage (now based on amount)
+    progress_percentage = progress_info['progress_percentage']
+    
+    # Create progress bar
+    progress_bar = html.Div([
+        html.Div([
+            html.H5("📊 Tagging Progress", className="text-primary mb-3"),
+            html.Div([
+                html.Div([
+                    html.Div(
+                        className="progress-bar",
+                        style={
+                            'width': f"{progress_percentage:.1f}%",
+                            'background': 'linear-gradient(90deg, #4CAF50, #45a049)',
+                            'height': '100%',
+                            'border-radius': '10px',
+                            'transition': 'width 0.6s ease'
+                        }
+                    )
+                ], className="progress", style={'height': '20px', 'border-radius': '10px', 'background-color': '#f0f0f0'}),
+                html.P(f"{progress_percentage:.1f}% Complete", className="text-center mt-2 mb-0")
+            ]),
+            html.Div([
+                html.P(f"💰 Tagged: {progress_info['tagged_amount']:.2f}€ / {progress_info['total_amount']:.2f}€ ({progress_info['tagged_transactions']}/{progress_info['total_transactions']} transactions)", 
+                       className="mb-1"),
+                html.P(f"⏳ Remaining: {progress_info['untagged_amount']:.2f}€ ({progress_info['untagged_transactions']} transactions)", 
+                       className="mb-1")
+            ], className="mt-3")
+        ], className="p-3 border rounded", style={'background-color': '#f8f9fa'})
+    ])
+    
+    return progress_bar
+
+
+def _get_save_buttons_state(progress_info):
+    """Get the save button label, color and disabled state, and the finish button disabled state"""
+    if progress_info['tagged_transactions'] == 0:
+        return "💾 Save Tagged File", "secondary", True, False  # Enable finish month even if nothing tagged
+    elif progress_info['progress_percentage'] == 100:
+        return f"🎉 Save Complete File ({progress_info['tagged_transactions']} tagged)", "success", False, False
+    else:
+        return f"💾 Save Progress ({progress_info['tagged_transactions']} tagged)", "primary", False, False
+
+
 def register_tagging_callbacks(app):
     """Register tagging workflow callbacks"""
     
@@ -35,68 +230,7 @@ def register_tagging_callbacks(app):
             return []
         
         try:
-            raw_files = get_raw_files()
-            
-            if not raw_files:
-                return html.Div([
-                    html.P("No raw files found in data/raw/ directory", className="text-muted"),
-                    html.P("Place your Revolut CSV files in the data/raw/ folder to start tagging", 
-                          className="text-info")
-                ])
-            
-            # Create a table with file information
-            table_data = []
-            for file_info in raw_files:
-                # Format file size
-                size_mb = file_info['size'] / (1024 * 1024)
-                size_str = f"{size_mb:.2f} MB"
-                
-                # Format modification date
-                mod_date = datetime.fromtimestamp(file_info['modified']).strftime('%Y-%m-%d %H:%M')
-                
-                table_data.append({
-                    'filename': file_info['filename'],
-                    'rows': file_info['num_rows'] if file_info['readable'] else 'Error',
-                    'size': size_str,
-                    'modified': mod_date,
-                    'status': 'Ready' if file_info['readable'] else 'Error'
-                })
-            
-            return html.Div([
-                dash_table.DataTable(
-                    id='raw-files-table',
-                    columns=[
-                        {"name": "📄 File Name", "id": "filename"},
-                        {"name": "📊 Rows", "id": "rows"},
-                        {"name": "💾 Size", "id": "size"},
-                        {"name": "📅 Modified", "id": "modified"},
-                        {"name": "🔍 Status", "id": "status"}
-                    ],
-                    data=table_data,
-                    style_cell={'textAlign': 'left'},
-                    style_data_conditional=[
-                        {
-                            'if': {'filter_query': '{status} = Error'},
-                            'backgroundColor': '#ffebee',
-                            'color': 'black',
-                        },
-                        {
-                            'if': {'filter_query': '{status} = Ready'},
-                            'backgroundColor': '#e8f5e8',
-                            'color': 'black',
-                        }
-                    ],
-                    style_header={
-                        'backgroundColor': '#f8f9fa',
-                        'fontWeight': 'bold'
-                    },
-                    row_selectable='single',
-                    selected_rows=[],
-                    page_size=10
-                ),
-                html.P(f"Found {len(raw_files)} raw file(s)", className="text-muted mt-2")
-            ])
-        
+            return _build_raw_files_display(get_raw_files_signature())
         except Exception as e:
             return html.Div([
                 html.P(f"Error loading raw files: {str(e)}", className="text-danger"),
@@ -124,20 +258,19 @@ def register_tagging_callbacks(app):
         filename = selected_file['filename']
         
         try:
-            # Preprocess the selected file
-            expenses_df, summary_info, untagged_summary = preprocess_raw_file(filename)
+            # Preprocess the selected file and load tagging configurations
+            expenses_df, summary_info, untagged_summary, tags, vendor_tags = _preprocess_raw_file(
+                filename, get_raw_file_version(filename)
+            )
             
             # Extract month from filename (assuming format: YYYY-MM.csv)
             month = filename.replace('.csv', '')
             
-            # Add month column to expenses
-            expenses_df['month'] = month
-            
-            # Load tagging configurations
-            tags, vendor_tags = load_tagging_configs()
+            # Add month column to expenses (on a new frame: the cached one is shared)
+            expenses_df = expenses_df.assign(month=month)
             
-            # Convert DataFrame to dict for storage
-            df_dict = expenses_df.to_dict('records')
+            # Keep the DataFrame server-side: the store only holds its key
+            df_key = prepare_dataframe_for_store(expenses_df)
             
             # Create summary display
             summary_display = html.Div([
@@ -165,7 +298,7 @@ def register_tagging_callbacks(app):
                 create_interactive_tagging_layout()
             ])
             
-            return summary_display, df_dict, tags, vendor_tags, filename, []
+            return summary_display, df_key, tags, vendor_tags, filename, []
             
         except Exception as e:
             return html.Div([
@@ -174,52 +307,26 @@ def register_tagging_callbacks(app):
             ]), None, None, None, None, []
 
     @app.callback(
-        Output('tagging-progress', 'children'),
+        [Output('tagging-progress', 'children'),
+         Output('save-file-btn', 'children'),
+         Output('save-file-btn', 'color'),
+         Output('save-file-btn', 'disabled'),
+         Output('finish-month-btn', 'disabled')],
         [Input('dataframe-store', 'data')]
     )
     def update_tagging_progress(df_data):
-        """Update tagging progress display"""
-        if not df_data:
-            return []
+        """Update tagging progress display and save buttons
         
-        # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
+        Both only depend on the tagging progress: it is computed once per
+        DataFrame change for the progress bar and the buttons.
+        """
+        if not df_data:
+            return [], "💾 Save Tagged File", "secondary", True, True
         
         # Get progress information
-        progress_info = get_tagging_progress(df)
-        
-        # Calculate progress percentage (now based on amount)
-        progress_percentage = progress_info['progress_percentage']
-        
-        # Create progress bar
-        progress_bar = html.Div([
-            html.Div([
-                html.H5("📊 Tagging Progress", className="text-primary mb-3"),
-                html.Div([
-                    html.Div([
-                        html.Div(
-                            className="progress-bar",
-                            style={
-                                'width': f"{progress_percentage:.1f}%",
-                                'background': 'linear-gradient(90deg, #4CAF50, #45a049)',
-                                'height': '100%',
-                                'border-radius': '10px',
-                                'transition': 'width 0.6s ease'
-                            }
-                        )
-                    ], className="progress", style={'height': '20px', 'border-radius': '10px', 'background-color': '#f0f0f0'}),
-                    html.P(f"{progress_percentage:.1f}% Complete", className="text-center mt-2 mb-0")
-                ]),
-                html.Div([
-                    html.P(f"💰 Tagged: {progress_info['tagged_amount']:.2f}€ / {progress_info['total_amount']:.2f}€ ({progress_info['tagged_transactions']}/{progress_info['total_transactions']} transactions)", 
-                           className="mb-1"),
-                    html.P(f"⏳ Remaining: {progress_info['untagged_amount']:.2f}€ ({progress_info['untagged_transactions']} transactions)", 
-                           className="mb-1")
-                ], className="mt-3")
-            ], className="p-3 border rounded", style={'background-color': '#f8f9fa'})
-        ])
+        progress_info = _get_tagging_progress(df_data)
         
-        return progress_bar
+        return (_build_progress_display(progress_info), *_get_save_buttons_state(progress_info))
 
     @app.callback(
         Output('vendor-cards-container', 'children', allow_duplicate=True),
@@ -233,11 +340,8 @@ def register_tagging_callbacks(app):
         if not df_data or not vendor_tags:
             return []
         
-        # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
-        
         # Get untagged vendors
-        vendors_data = get_untagged_vendors_from_df(df, vendor_tags)
+        vendors_data = _get_untagged_vendors(df_data, frozenset(vendor_tags))
         
         if not vendors_data:
             return [html.P("No vendors to tag", className="text-muted")]
@@ -302,128 +406,155 @@ def register_tagging_callbacks(app):
             raise PreventUpdate
         
         # Find which card was clicked
-        triggered_id = ctx.triggered[0]['prop_id']
+        triggered_id = ctx.triggered_id
         
-        # Extract vendor name from the triggered prop_id
-        if '"type":"vendor-card"' in triggered_id:
-            # Parse the vendor name from the triggered prop_id
-            import re
-            match = re.search(r'"index":"([^"]*)"', triggered_id)
-            if match:
-                clicked_vendor = match.group(1)
+        if isinstance(triggered_id, dict) and triggered_id['type'] == 'vendor-card':
+            clicked_vendor = triggered_id['index']
+            
+            if selected_vendors is None:
+                selected_vendors = []
                 
-                if selected_vendors is None:
-                    selected_vendors = []
+            # Toggle vendor selection
+            if clicked_vendor in selected_vendors:
+                # Remove vendor if already selected
+                selected_vendors.remove(clicked_vendor)
+            else:
+                # Add vendor if not selected
+                selected_vendors.append(clicked_vendor)
                 
-                # Toggle vendor selection
-                if clicked_vendor in selected_vendors:
-                    # Remove vendor if already selected
-                    selected_vendors.remove(clicked_vendor)
+            # Update card styles based on selection
+            card_styles = []
+            for card_id in card_ids:
+                vendor_name = card_id['index']
+                if vendor_name in selected_vendors:
+                    style = {
+                        'border': '2px solid #007bff',
+                        'border-radius': '8px',
+                        'background-color': '#e7f3ff',
+                        'transition': 'all 0.2s ease',
+                        'cursor': 'pointer',
+                        'transform': 'scale(1.02)'
+                    }
                 else:
-                    # Add vendor if not selected
-                    selected_vendors.append(clicked_vendor)
+                    style = {
+                        'border': '1px solid #dee2e6',
+                        'border-radius': '8px',
+                        'transition': 'all 0.2s ease',
+                        'cursor': 'pointer'
+                    }
+                card_styles.append(style)
                 
-                # Update card styles based on selection
-                card_styles = []
-                for card_id in card_ids:
-                    vendor_name = card_id['index']
-                    if vendor_name in selected_vendors:
-                        style = {
-                            'border': '2px solid #007bff',
-                            'border-radius': '8px',
-                            'background-color': '#e7f3ff',
-                            'transition': 'all 0.2s ease',
-                            'cursor': 'pointer',
-                            'transform': 'scale(1.02)'
-                        }
-                    else:
-                        style = {
-                            'border': '1px solid #dee2e6',
-                            'border-radius': '8px',
-                            'transition': 'all 0.2s ease',
-                            'cursor': 'pointer'
-                        }
-                    card_styles.append(style)
-                
-                # Reset selected transactions and tags when vendor selection changes
-                return selected_vendors, [], [], card_styles
+            # Reset selected transactions and tags when vendor selection changes
+            return selected_vendors, [], [], card_styles
         
         raise PreventUpdate
 
 
     @app.callback(
-        Output('transaction-details', 'children'),
+        Output('transaction-details-store', 'data'),
         [Input('selected-vendors-store', 'data'),
          Input('dataframe-store', 'data')]
     )
     def update_transaction_details(selected_vendors, df_data):
-        """Update transaction details display"""
+        """Update the transactions to display for the selected vendors
+        
+        Only the fields shown on the cards are sent: the cards themselves are
+        built in the browser (see the clientside callback below).
+        """
         if not df_data:
-            return []
+            return None
         
         # Vérifier explicitement si des vendeurs sont sélectionnés
         if not selected_vendors or len(selected_vendors) == 0:
-            return html.P("Select vendors to see transaction details", className="text-muted")
+            return {'transactions': []}
         
         # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
+        df = _restore_dataframe(df_data)
         
         # Get transaction details for selected vendors
         transaction_info = get_transaction_details_for_vendors(df, selected_vendors)
         
-        if not transaction_info['transactions']:
-            return html.P("Select vendors to see transaction details", className="text-muted")
-        
-        # Create transaction cards
-        transaction_cards = []
-        for idx, transaction in enumerate(transaction_info['transactions']):
-            card_content = html.Div([
-                html.Div([
-                    # Contenu principal de la transaction
-                    html.Div([
-                        html.H6(f"🏪 {transaction['vendor']}", className="mb-1"),
-                        html.P(f"💰 {transaction['display_amount']}", className="mb-1"),
-                        html.P(f"📅 {transaction['display_date']}", className="mb-0 text-muted")
-                    ], style={'flex': '1'}),
-                    
-                    # Icônes d'action (visibles uniquement si sélectionné)
-                    html.Div([
-                        dbc.Button(
-                            "✏️", 
-                            id={'type': 'edit-transaction-btn', 'index': transaction['id']},
-                            size="sm", 
-                            color="warning", 
-                            outline=True,
-                            className="me-1",
-                            style={'display': 'none'}  # Caché par défaut
-                        ),
-                        dbc.Button(
-                            "🗑️", 
-                            id={'type': 'delete-transaction-btn', 'index': transaction['id']},
-                            size="sm", 
-                            color="danger", 
-                            outline=True,
-                            style={'display': 'none'}  # Caché par défaut
-                        )
-                    ], className="action-buttons", style={'display': 'flex', 'align-items': 'center'})
-                ], className="card-body p-2 d-flex justify-content-between align-items-center")
-            ], 
-            id={'type': 'transaction-card', 'index': transaction['id']}, 
-            className="card transaction-card mb-2 cursor-pointer",
-            style={
-                'border': '1px solid #dee2e6',
-                'border-radius': '8px',
-                'transition': 'all 0.2s ease',
-                'cursor': 'pointer'
-            })
-            
-            transaction_cards.append(card_content)
-        
-        return html.Div([
-            html.H6(f"📋 Transaction Details ({len(transaction_info['transactions'])} transactions)", 
-                   className="text-primary mb-3"),
-            html.Div(transaction_cards, className="transaction-details-container")
-        ])
+        return {
+            'transactions': [
+                {
+                    'id': transaction['id'],
+                    'vendor': transaction['vendor'],
+                    'display_amount': transaction['display_amount'],
+                    'display_date': transaction['display_date']
+                }
+                for transaction in transaction_info['transactions']
+            ]
+        }
+
+    # Transaction cards are built in the browser: the server only sends the
+    # displayed fields instead of a component tree per transaction
+    app.clientside_callback(
+        """
+        function(details) {
+            if (!details) {
+                return [];
+            }
+            const component = (namespace, type, props) => ({namespace, type, props});
+            const div = (props) => component('dash_html_components', 'Div', props);
+            const transactions = details.transactions;
+            if (transactions.length === 0) {
+                return component('dash_html_components', 'P', {
+                    children: 'Select vendors to see transaction details', className: 'text-muted'
+                });
+            }
+            const actionButton = (type, label, color, transactionId, className) => component(
+                'dash_bootstrap_components', 'Button', {
+                    children: label,
+                    id: {type: type, index: transactionId},
+                    size: 'sm',
+                    color: color,
+                    outline: true,
+                    className: className,
+                    style: {display: 'none'}  // Caché par défaut
+                }
+            );
+            const cards = transactions.map((transaction) => div({
+                children: [div({
+                    children: [
+                        // Contenu principal de la transaction
+                        div({
+                            children: [
+                                component('dash_html_components', 'H6', {children: `🏪 ${transaction.vendor}`, className: 'mb-1'}),
+                                component('dash_html_components', 'P', {children: `💰 ${transaction.display_amount}`, className: 'mb-1'}),
+                                component('dash_html_components', 'P', {children: `📅 ${transaction.display_date}`, className: 'mb-0 text-muted'})
+                            ],
+                            style: {flex: '1'}
+                        }),
+                        // Icônes d'action (visibles uniquement si sélectionné)
+                        div({
+                            children: [
+                                actionButton('edit-transaction-btn', '✏️', 'warning', transaction.id, 'me-1'),
+                                actionButton('delete-transaction-btn', '🗑️', 'danger', transaction.id, undefined)
+                            ],
+                            className: 'action-buttons',
+                            style: {display: 'flex', 'align-items': 'center'}
+                        })
+                    ],
+                    className: 'card-body p-2 d-flex justify-content-between align-items-center'
+                })],
+                id: {type: 'transaction-card', index: transaction.id},
+                className: 'card transaction-card mb-2 cursor-pointer',
+                style: TRANSACTION_CARD_STYLE
+            }));
+            return div({
+                children: [
+                    component('dash_html_components', 'H6', {
+                        children: `📋 Transaction Details (${transactions.length} transactions)`,
+                        className: 'text-primary mb-3'
+                    }),
+                    div({children: cards, className: 'transaction-details-container'})
+                ]
+            });
+        }
+        """.replace('TRANSACTION_CARD_STYLE', json.dumps(TRANSACTION_CARD_STYLE)),
+        Output('transaction-details', 'children'),
+        Input('transaction-details-store', 'data')
+    )
 
     @app.callback(
         [Output('selected-transaction-store', 'data'),
@@ -438,41 +569,29 @@ def register_tagging_callbacks(app):
         if not ctx.triggered or not any(n_clicks > 0 for n_clicks in n_clicks_list if n_clicks is not None):
             raise PreventUpdate
         
-        triggered_id = ctx.triggered[0]['prop_id']
+        triggered_id = ctx.triggered_id
         
-        if '"type":"transaction-card"' in triggered_id:
-            import re
-            match = re.search(r'"index":"([^"]*)"', triggered_id)
-            if match:
-                clicked_transaction_id = match.group(1)
-                
-                if selected_transactions is None:
-                    selected_transactions = []
-                
-                # Toggle selection
-                if clicked_transaction_id in selected_transactions:
-                    selected_transactions.remove(clicked_transaction_id)
-                else:
-                    selected_transactions.append(clicked_transaction_id)
+        if isinstance(triggered_id, dict) and triggered_id['type'] == 'transaction-card':
+            clicked_transaction_id = triggered_id['index']
+            
+            if selected_transactions is None:
+                selected_transactions = []
                 
-                # Update card styles
-                card_styles = []
-                for card_id in card_ids:
-                    transaction_id = card_id['index']
-                    if transaction_id in selected_transactions:
-                        style = {
-                            'border': '2px solid #007bff', 'border-radius': '8px',
-                            'background-color': '#e7f3ff', 'transition': 'all 0.2s ease',
-                            'cursor': 'pointer', 'transform': 'scale(1.02)'
-                        }
-                    else:
-                        style = {
-                            'border': '1px solid #dee2e6', 'border-radius': '8px',
-                            'transition': 'all 0.2s ease', 'cursor': 'pointer'
-                        }
-                    card_styles.append(style)
+            # Toggle selection
+            if clicked_transaction_id in selected_transactions:
+                selected_transactions.remove(clicked_transaction_id)
+                clicked_style = TRANSACTION_CARD_STYLE
+            else:
+                selected_transactions.append(clicked_transaction_id)
+                clicked_style = SELECTED_TRANSACTION_CARD_STYLE
                 
-                return selected_transactions, card_styles
+            # Only the clicked card changes: leave the other cards untouched
+            card_styles = [
+                clicked_style if card_id['index'] == clicked_transaction_id else no_update
+                for card_id in card_ids
+            ]
+            
+            return selected_transactions, card_styles
         
         raise PreventUpdate
 
@@ -489,25 +608,20 @@ def register_tagging_callbacks(app):
             raise PreventUpdate
         
         # Find which badge was clicked
-        triggered_id = ctx.triggered[0]['prop_id']
+        triggered_id = ctx.triggered_id
         
-        # Extract tag value from the triggered prop_id
-        if '"type":"tag-badge"' in triggered_id:
-            # Parse the tag value from the triggered prop_id
-            import re
-            match = re.search(r'"index":"([^"]*)"', triggered_id)
-            if match:
-                clicked_tag = match.group(1)
-                
-                # Toggle tag selection
-                if clicked_tag in selected_tags:
-                    # Remove tag if already selected
-                    selected_tags.remove(clicked_tag)
-                else:
-                    # Add tag if not selected
-                    selected_tags.append(clicked_tag)
+        if isinstance(triggered_id, dict) and triggered_id['type'] == 'tag-badge':
+            clicked_tag = triggered_id['index']
+            
+            # Toggle tag selection
+            if clicked_tag in selected_tags:
+                # Remove tag if already selected
+                selected_tags.remove(clicked_tag)
+            else:
+                # Add tag if not selected
+                selected_tags.append(clicked_tag)
                 
-                return selected_tags
+            return selected_tags
         
         raise PreventUpdate
 
@@ -522,6 +636,10 @@ def register_tagging_callbacks(app):
     )
     def update_tag_cloud(selected_transactions, selected_vendors, tags_config, vendor_tags_config, selected_tags, df_data):
         """Update tag cloud based on current selection"""
+        # The cloud is hidden without a selection: it is rebuilt once one is made
+        if not selected_transactions and not selected_vendors:
+            raise PreventUpdate
+        
         if not tags_config or not vendor_tags_config:
             return [html.P("Loading tags...", className="text-muted")]
         
@@ -529,7 +647,7 @@ def register_tagging_callbacks(app):
         vendors_for_suggestions = []
         if selected_transactions and df_data:
             # Mode 1: One or more transactions are selected
-            df = restore_dataframe_from_store(df_data)
+            df = _restore_dataframe(df_data)
             vendors = set()
             for trans_id in selected_transactions:
                 try:
@@ -545,33 +663,30 @@ def register_tagging_callbacks(app):
             vendors_for_suggestions = selected_vendors
 
         # Get suggested tags based on the determined vendors
-        from ..utilities.data_loader import get_suggested_tags_for_vendors
         suggested_tags = get_suggested_tags_for_vendors(
             vendors_for_suggestions, tags_config, vendor_tags_config
         )
         
         return [create_tag_cloud(suggested_tags, selected_tags or [])]
 
-    @app.callback(
-        Output('tagging-panel-content', 'children'),
+    # The panel only switches between its two views: done in the browser,
+    # without a server round-trip on every selection
+    app.clientside_callback(
+        """
+        function(selectedTransactions, selectedVendors) {
+            const active = (selectedVendors && selectedVendors.length > 0) ||
+                (selectedTransactions && selectedTransactions.length > 0);
+            return [
+                {display: active ? 'none' : 'block'},
+                {display: active ? 'block' : 'none'}
+            ];
+        }
+        """,
+        [Output('tagging-panel-placeholder', 'style'),
+         Output('tagging-panel-form', 'style')],
         [Input('selected-transaction-store', 'data'),
          Input('selected-vendors-store', 'data')]
     )
-    def update_tagging_panel(selected_transactions, selected_vendors):
-        """Update tagging panel based on selection."""
-        # This panel is active if vendors or transactions are selected
-        if selected_vendors or selected_transactions:
-            return html.Div([
-                html.Div(id='tag-cloud-container', className="mb-3"),
-                dbc.Input(id='new-tags-input', placeholder='Enter new tags, comma-separated...', className="mb-3"),
-                dbc.Button("Apply Tags", id='apply-tags-btn', color="primary", className="w-100")
-            ])
-        
-        # Default view when nothing is selected
-        return html.Div([
-            html.I(className="fas fa-hand-pointer fa-2x text-muted"),
-            html.P("Select vendors or transactions to start tagging", className="text-muted mt-2 mb-0")
-        ], className="text-center py-4")
 
 
     @app.callback(
@@ -582,22 +697,28 @@ def register_tagging_callbacks(app):
     def update_daily_context(selected_transactions, df_data):
         """Update daily context display."""
         # Daily context is only shown for a single selected transaction
-        if df_data and selected_transactions and len(selected_transactions) == 1:
-            df = restore_dataframe_from_store(df_data)
+        is_single_selection = bool(selected_transactions) and len(selected_transactions) == 1
+        
+        # Tagging changes the DataFrame but not the default view shown without one
+        if not is_single_selection and set(ctx.triggered_prop_ids) == {'dataframe-store.data'}:
+            raise PreventUpdate
+        
+        if df_data and is_single_selection:
             transaction_id = selected_transactions[0]  # Get the single ID from the list
-            daily_context_data = get_daily_context_for_transaction(df, transaction_id)
+            daily_context_data = _get_daily_context(df_data, transaction_id)
             
             if not daily_context_data['transactions']:
                 return html.P("No other transactions on this day.", className="text-muted")
             
-            # Create a list of transactions for display
+            # Create a list of transactions for display: plain text rows, with a
+            # styled span only for the selected one and a badge only when tagged
             transaction_list = []
             for trans in daily_context_data['transactions']:
-                style = {'font-weight': 'bold', 'color': '#007bff'} if trans['is_selected'] else {}
-                transaction_list.append(html.Div([
-                    html.Span(f"{trans['time']} - {trans['vendor']} - {trans['display_amount']}", style=style),
-                    dbc.Badge(trans['tags_display'], color="info", pill=True, className="ms-2") if trans['has_tags'] else None
-                ], className="d-flex justify-content-between align-items-center mb-1"))
+                text = f"{trans['time']} - {trans['vendor']} - {trans['display_amount']}"
+                row = [html.Span(text, style={'font-weight': 'bold', 'color': '#007bff'}) if trans['is_selected'] else text]
+                if trans['has_tags']:
+                    row.append(dbc.Badge(trans['tags_display'], color="info", pill=True, className="ms-2"))
+                transaction_list.append(html.Div(row, className="d-flex justify-content-between align-items-center mb-1"))
 
             return html.Div([
                 html.H6(f"Transactions for {daily_context_data['summary']['date_display']}", className="mb-2"),
@@ -636,31 +757,34 @@ def register_tagging_callbacks(app):
         if not n_clicks:
             raise PreventUpdate
             
-        from dash import no_update
-        df = restore_dataframe_from_store(df_data)
+        # The tagging helpers below return a modified copy: no need for one here
+        try:
+            df = restore_dataframe_from_store(df_data, copy=False)
+        except DataFrameExpiredError:
+            return no_update, EXPIRED_DATAFRAME_ALERT, no_update, no_update, no_update, no_update
 
         # Prepare tags
         new_tags = []
         if new_tags_input:
             new_tags = [tag.strip() for tag in new_tags_input.split(',') if tag.strip()]
         
-        all_tags = (selected_tags or []) + new_tags
+        all_tags = list(dict.fromkeys(chain(selected_tags or (), new_tags)))
         if not all_tags:
-            return no_update, dbc.Alert("No tags selected or entered.", color="warning"), no_update, no_update, "", no_update
+            return no_update, NO_TAGS_ALERT, no_update, no_update, "", no_update
 
         # Determine mode: multi-transaction or vendor-based
         if selected_transactions:
             # --- Multi-transaction Tagging ---
             df_updated, affected_count, tagged_vendors = apply_tags_to_transactions(
-                df, selected_transactions, all_tags
+                df.copy(), selected_transactions, all_tags
             )
             
             if affected_count > 0:
                 update_configurations_on_disk(all_tags, list(tagged_vendors))
                 feedback = dbc.Alert(f"✅ Successfully tagged {affected_count} transaction(s).", color="success")
-                return df_updated.to_dict('records'), feedback, no_update, [], "", []
+                return prepare_dataframe_for_store(df_updated), feedback, no_update, [], "", []
             else:
-                feedback = dbc.Alert("⚠️ No transactions were tagged (they may already be tagged).", color="warning")
+                feedback = NO_TRANSACTIONS_TAGGED_ALERT
                 return no_update, feedback, no_update, no_update, no_update, no_update
         
         elif selected_vendors:
@@ -670,41 +794,16 @@ def register_tagging_callbacks(app):
             if affected_count > 0:
                 update_configurations_on_disk(all_tags, selected_vendors)
                 feedback = dbc.Alert(f"✅ Successfully tagged {affected_count} transactions for {len(selected_vendors)} vendor(s).", color="success")
-                return df_updated.to_dict('records'), feedback, [], [], "", []
+                return prepare_dataframe_for_store(df_updated), feedback, [], [], "", []
             else:
-                feedback = dbc.Alert("⚠️ No untagged transactions found for the selected vendor(s).", color="warning")
+                feedback = NO_UNTAGGED_VENDOR_TRANSACTIONS_ALERT
         
         else:
-            feedback = dbc.Alert("Select vendors or transactions first.", color="info")
+            feedback = NO_SELECTION_ALERT
 
         # Fallback return for cases that don't update the dataframe
         return no_update, feedback, no_update, no_update, no_update, no_update
 
-    @app.callback(
-        [Output('save-file-btn', 'children'),
-         Output('save-file-btn', 'color'),
-         Output('save-file-btn', 'disabled'),
-         Output('finish-month-btn', 'disabled')],
-        [Input('dataframe-store', 'data')]
-    )
-    def update_save_button(df_data):
-        """Update save button appearance based on tagging progress"""
-        if not df_data:
-            return "💾 Save Tagged File", "secondary", True, True
-        
-        # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
-        
-        # Get progress information
-        progress_info = get_tagging_progress(df)
-        
-        if progress_info['tagged_transactions'] == 0:
-            return "💾 Save Tagged File", "secondary", True, False  # Enable finish month even if nothing tagged
-        elif progress_info['progress_percentage'] == 100:
-            return f"🎉 Save Complete File ({progress_info['tagged_transactions']} tagged)", "success", False, False
-        else:
-            return f"💾 Save Progress ({progress_info['tagged_transactions']} tagged)", "primary", False, False
-
     @app.callback(
         [Output('tagging-feedback', 'children', allow_duplicate=True),
          Output('refresh-visualizations-store', 'data', allow_duplicate=True)],
@@ -719,11 +818,14 @@ def register_tagging_callbacks(app):
         if not n_clicks or not df_data or not filename:
             raise PreventUpdate
         
-        # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
+        # Only read here: the tagged rows are copied below before being saved
+        try:
+            df = restore_dataframe_from_store(df_data, copy=False)
+        except DataFrameExpiredError:
+            return EXPIRED_DATAFRAME_ALERT, current_refresh
         
-        # Get progress information
-        progress_info = get_tagging_progress(df)
+        # Get progress information (already computed for the progress display)
+        progress_info = _get_tagging_progress(df_data)
         
         if progress_info['tagged_transactions'] == 0:
             return dbc.Alert(
@@ -733,7 +835,7 @@ def register_tagging_callbacks(app):
             ), current_refresh
         
         # Filter only tagged transactions for saving
-        tagged_mask = df["tags"].apply(lambda tags: len(tags) > 0)
+        tagged_mask = ~get_untagged_mask(df["tags"])
         tagged_df = df[tagged_mask].copy()
         
         # Save only tagged transactions
@@ -786,8 +888,11 @@ def register_tagging_callbacks(app):
         if not n_clicks or not df_data or not filename:
             raise PreventUpdate
         
-        # Restore DataFrame from store
-        df = restore_dataframe_from_store(df_data)
+        # Only read here: the rows are copied below before being saved
+        try:
+            df = restore_dataframe_from_store(df_data, copy=False)
+        except DataFrameExpiredError:
+            return EXPIRED_DATAFRAME_ALERT, current_refresh, no_update
         
         if df.empty:
             return dbc.Alert(
@@ -837,65 +942,7 @@ def register_tagging_callbacks(app):
         
         # Refresh raw files list
         try:
-            raw_files = get_raw_files()
-            
-            if not raw_files:
-                raw_files_display = html.Div([
-                    html.P("No raw files found in data/raw/ directory", className="text-muted"),
-                    html.P("Place your Revolut CSV files in the data/raw/ folder to start tagging", 
-                          className="text-info")
-                ])
-            else:
-                # Create a table with file information
-                table_data = []
-                for file_info in raw_files:
-                    size_mb = file_info['size'] / (1024 * 1024)
-                    size_str = f"{size_mb:.2f} MB"
-                    mod_date = datetime.fromtimestamp(file_info['modified']).strftime('%Y-%m-%d %H:%M')
-                    
-                    table_data.append({
-                        'filename': file_info['filename'],
-                        'rows': file_info['num_rows'] if file_info['readable'] else 'Error',
-                        'size': size_str,
-                        'modified': mod_date,
-                        'status': 'Ready' if file_info['readable'] else 'Error'
-                    })
-                
-                from dash import dash_table
-                raw_files_display = html.Div([
-                    dash_table.DataTable(
-                        id='raw-files-table',
-                        columns=[
-                            {"name": "📄 File Name", "id": "filename"},
-                            {"name": "📊 Rows", "id": "rows"},
-                            {"name": "💾 Size", "id": "size"},
-                            {"name": "📅 Modified", "id": "modified"},
-                            {"name": "🔍 Status", "id": "status"}
-                        ],
-                        data=table_data,
-                        style_cell={'textAlign': 'left'},
-                        style_data_conditional=[
-                            {
-                                'if': {'filter_query': '{status} = Error'},
-                                'backgroundColor': '#ffebee',
-                                'color': 'black',
-                            },
-                            {
-                                'if': {'filter_query': '{status} = Ready'},
-                                'backgroundColor': '#e8f5e8',
-                                'color': 'black',
-                            }
-                        ],
-                        style_header={
-                            'backgroundColor': '#f8f9fa',
-                            'fontWeight': 'bold'
-                        },
-                        row_selectable='single',
-                        selected_rows=[],
-                        page_size=10
-                    ),
-                    html.P(f"Found {len(raw_files)} raw file(s)", className="text-muted mt-2")
-                ])
+            raw_files_display = _build_raw_files_display(get_raw_files_signature())
         except Exception as e:
             raw_files_display = html.Div([
                 html.P(f"Error loading raw files: {str(e)}", className="text-danger"),
@@ -931,11 +978,8 @@ def register_tagging_callbacks(app):
             return [], None, []
         
         try:
-            from datetime import datetime
-            from dateutil.relativedelta import relativedelta
-            
             # Get transaction date
-            df = restore_dataframe_from_store(df_data)
+            df = restore_dataframe_from_store(df_data, copy=False)
             trans_id = selected_transactions[0]
             df_index = int(trans_id.split('_')[1])
             trans_date = pd.to_datetime(df.loc[df_index, 'Date'])
@@ -969,9 +1013,6 @@ def register_tagging_callbacks(app):
             return "Entrez un montant valide"
         
         try:
-            from datetime import datetime
-            from dateutil.relativedelta import relativedelta
-            
             start = datetime.strptime(start_month, '%Y-%m')
             end = datetime.strptime(end_month, '%Y-%m')
             
@@ -1070,7 +1111,8 @@ def register_tagging_callbacks(app):
             # Obtenir le montant actuel
             single_transaction_id = selected_transactions[0]
             df_index = int(single_transaction_id.split('_')[1])
-            df = restore_dataframe_from_store(df_data)
+            # Only two values are read: no copy of the stored DataFrame
+            df = _restore_dataframe(df_data)
             current_amount = abs(df.loc[df_index, 'Amount'])
             
             # Get transaction date for default month
@@ -1122,7 +1164,10 @@ def register_tagging_callbacks(app):
         
         single_transaction_id = selected_transactions[0]
         df_index = int(single_transaction_id.split('_')[1])
-        df = restore_dataframe_from_store(df_data)
+        try:
+            df = restore_dataframe_from_store(df_data)
+        except DataFrameExpiredError:
+            return no_update, EXPIRED_DATAFRAME_ALERT, no_update, no_update
         
         if spread_enabled and start_month and end_month:
             # SPREAD MODE: Create multiple transactions
@@ -1199,26 +1244,27 @@ def register_tagging_callbacks(app):
             raise PreventUpdate
         
         # Trouver quel bouton a été cliqué
-        triggered_id = ctx.triggered[0]['prop_id']
-        if '"type":"delete-transaction-btn"' in triggered_id:
-            import re
-            match = re.search(r'"index":"([^"]*)"', triggered_id)
-            if match:
-                transaction_id = match.group(1)
-                df_index = int(transaction_id.split('_')[1])
-                df = restore_dataframe_from_store(df_data)
-                
-                # Supprimer la transaction
-                df = df.drop(index=df_index)
-                
-                feedback = dbc.Alert(
-                    "🗑️ Transaction supprimée avec succès",
-                    color="info",
-                    dismissable=True
-                )
-                
-                # Garder les vendeurs sélectionnés pour maintenir le contexte
-                # mais forcer la mise à jour de l'affichage
-                return prepare_dataframe_for_store(df), feedback, None, selected_vendors
+        triggered_id = ctx.triggered_id
+        if isinstance(triggered_id, dict) and triggered_id['type'] == 'delete-transaction-btn':
+            transaction_id = triggered_id['index']
+            df_index = int(transaction_id.split('_')[1])
+            # drop() returns a new DataFrame: the stored one is not modified
+            try:
+                df = restore_dataframe_from_store(df_data, copy=False)
+            except DataFrameExpiredError:
+                return no_update, EXPIRED_DATAFRAME_ALERT, no_update, no_update
+            
+            # Supprimer la transaction
+            df = df.drop(index=df_index)
+            
+            feedback = dbc.Alert(
+                "🗑️ Transaction supprimée avec succès",
+                color="info",
+                dismissable=True
+            )
+            
+            # Garder les vendeurs sélectionnés pour maintenir le contexte
+            # mais forcer la mise à jour de l'affichage
+            return prepare_dataframe_for_store(df), feedback, None, selected_vendors
         
         raise PreventUpdate 
\ No newline at end of file
@@ -1,169 +1,161 @@
 """
 Time series analysis callbacks for the dashboard
 """
-import plotly.graph_objects as go
+from functools import lru_cache
+
 from dash import Input, Output, html
 import pandas as pd
 
 from ..utilities.data_loader import (
-    load_config, load_all_processed_data, get_main_category,
-    prepare_timeseries_data
+    load_categorized_expenses, prepare_timeseries_data, get_data_version
 )
+from .layouts import create_figure
+
+
+@lru_cache(maxsize=4)
+def _get_timeseries_data(data_version: tuple) -> tuple:
+    """Get (exceptional, regular, monthly_totals) for all expenses, cached per data version
+    
+    Returns None when there is no data. The returned DataFrames are shared
+    between callbacks and must not be modified.
+    """
+    all_data = load_categorized_expenses()
+    
+    if all_data.empty:
+        return None
+    
+    return prepare_timeseries_data(all_data)
+
+
+@lru_cache(maxsize=4)
+def _build_timeseries_figure(data_version: tuple) -> dict:
+    """Build the stacked area figure of monthly expenses, cached per data version"""
+    timeseries_data = _get_timeseries_data(data_version)
+    if timeseries_data is None:
+        return {}
+    
+    exceptional, regular, monthly_totals = timeseries_data
+    
+    # Always the same two traces (empty without data) so that plotly.js
+    # updates them in place instead of rebuilding the chart
+    
+    # Regular expenses as base area (bottom)
+    regular_trace = dict(
+        type='scattergl',
+        x=regular['month'].to_numpy(),
+        y=regular['amount_abs'].to_numpy(),
+        fill='tozeroy',
+        mode='lines',
+        name='Regular Expenses',
+        line=dict(width=0, color='#4ECDC4'),
+        fillcolor='rgba(78, 205, 196, 0.7)',
+        hovertemplate='%{x}<br>Regular: %{y:.2f}€<extra></extra>'
+    )
+    
+    # Exceptional expenses stacked on top (regular + exceptional), aligned on month.
+    # Without regular expenses, tonexty fills down to zero
+    exceptional_months = exceptional['month'].to_numpy()
+    regular_amounts = regular.set_index(regular['month'].astype(str))['amount_abs'].reindex(exceptional_months, fill_value=0)
+    stacked_values = regular_amounts.to_numpy() + exceptional['amount_abs'].to_numpy()
+    
+    exceptional_trace = dict(
+        type='scattergl',
+        x=exceptional_months,
+        y=stacked_values,
+        fill='tonexty',
+        mode='lines',
+        name='Exceptional Expenses',
+        line=dict(width=0, color='#FF6B6B'),
+        fillcolor='rgba(255, 107, 107, 0.7)',
+        hovertemplate='%{x}<br>Exceptional: %{customdata:.2f}€<br>Total: %{y:.2f}€<extra></extra>',
+        customdata=exceptional['amount_abs'].to_numpy()
+    )
+    
+    fig = create_figure(
+        data=[regular_trace, exceptional_trace],
+        title="Monthly Expense Evolution",
+        xaxis_title="Month",
+        yaxis_title="Amount (€)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hovermode='x unified',
+        margin=dict(t=60, b=40, l=40, r=40)
+    )
+    
+    return fig
+
+
+@lru_cache(maxsize=4)
+def _build_timeseries_stats(data_version: tuple) -> list:
+    """Build the statistics panel components, cached per data version"""
+    timeseries_data = _get_timeseries_data(data_version)
+    if timeseries_data is None:
+        return []
+    
+    # Calculate statistics
+    exceptional, regular, monthly_totals = timeseries_data
+    
+    stats_components = [
+        html.H4("📊 Statistics", className="text-primary mb-3"),
+    ]
+    
+    # Monthly totals as a plain array, extracted once
+    monthly_amounts = monthly_totals['amount_abs'].to_numpy()
+    
+    if len(monthly_amounts):
+        avg_monthly = monthly_amounts.mean()
+        max_monthly = monthly_amounts.max()
+        min_monthly = monthly_amounts.min()
+    
+        stats_components.extend([
+            html.P(f"📈 Average monthly: {avg_monthly:.2f}€"),
+            html.P(f"🔼 Highest month: {max_monthly:.2f}€"),
+            html.P(f"🔽 Lowest month: {min_monthly:.2f}€"),
+            html.Hr()
+        ])
+    
+    if not exceptional.empty:
+        avg_exceptional = exceptional['amount_abs'].mean()
+        stats_components.append(html.P(f"⚠️ Avg exceptional: {avg_exceptional:.2f}€"))
+    
+    if not regular.empty:
+        avg_regular = regular['amount_abs'].mean()
+        stats_components.append(html.P(f"🔄 Avg regular: {avg_regular:.2f}€"))
+    
+    # Add trend analysis
+    if len(monthly_amounts) >= 2:
+        trend = monthly_amounts[-1] - monthly_amounts[-2]
+        trend_icon = "📈" if trend > 0 else "📉"
+        trend_word = "increase" if trend > 0 else "decrease"
+        stats_components.extend([
+            html.Hr(),
+            html.P(f"{trend_icon} Last month {trend_word}: {abs(trend):.2f}€")
+        ])
+    
+    return stats_components
 
 
 def register_timeseries_callbacks(app):
     """Register time series analysis callbacks"""
 
     @app.callback(
-        Output('timeseries-stacked-area', 'figure'),
+        [Output('timeseries-stacked-area', 'figure'),
+         Output('timeseries-stats', 'children')],
         [Input('main-tabs', 'value'),
          Input('refresh-visualizations-store', 'data')]
     )
-    def update_timeseries_stacked_area(active_tab, refresh_trigger):
-        """Update the main timeseries stacked area chart"""
-        if active_tab != 'timeseries-tab':
-            return {}
-        
-        # Load all processed data dynamically
-        try:
-            main_categories = load_config('main_categories.json')
-            all_data = load_all_processed_data()
-            
-            # Apply main categories to all data
-            if not all_data.empty:
-                all_data['main_category'] = all_data['parsed_tags'].apply(
-                    lambda tags: get_main_category(tags, main_categories)
-                )
-            else:
-                return {}
-                
-        except Exception as e:
-            print(f"Error loading timeseries data: {e}")
-            return {}
-            
-        exceptional, regular, monthly_totals = prepare_timeseries_data(all_data)
+    def update_timeseries(active_tab, refresh_trigger):
+        """Update the main timeseries stacked area chart and its statistics panel
         
-        fig = go.Figure()
-        
-        # Add regular expenses as base area (bottom)
-        if not regular.empty:
-            fig.add_trace(go.Scatter(
-                x=regular['month'],
-                y=regular['amount_abs'],
-                fill='tozeroy',
-                mode='lines',
-                name='Regular Expenses',
-                line=dict(width=0, color='#4ECDC4'),
-                fillcolor='rgba(78, 205, 196, 0.7)',
-                hovertemplate='%{x}<br>Regular: %{y:.2f}€<extra></extra>'
-            ))
-        
-        # Add exceptional expenses stacked on top
-        if not exceptional.empty and not regular.empty:
-            # Calculate stacked values (regular + exceptional)
-            stacked_values = []
-            for month in exceptional['month']:
-                regular_amount = regular[regular['month'] == month]['amount_abs'].iloc[0] if len(regular[regular['month'] == month]) > 0 else 0
-                exceptional_amount = exceptional[exceptional['month'] == month]['amount_abs'].iloc[0]
-                stacked_values.append(regular_amount + exceptional_amount)
-            
-            fig.add_trace(go.Scatter(
-                x=exceptional['month'],
-                y=stacked_values,
-                fill='tonexty',
-                mode='lines',
-                name='Exceptional Expenses',
-                line=dict(width=0, color='#FF6B6B'),
-                fillcolor='rgba(255, 107, 107, 0.7)',
-                hovertemplate='%{x}<br>Exceptional: %{customdata:.2f}€<br>Total: %{y:.2f}€<extra></extra>',
-                customdata=exceptional['amount_abs']
-            ))
-        elif not exceptional.empty and regular.empty:
-            # Only exceptional expenses exist
-            fig.add_trace(go.Scatter(
-                x=exceptional['month'],
-                y=exceptional['amount_abs'],
-                fill='tozeroy',
-                mode='lines',
-                name='Exceptional Expenses',
-                line=dict(width=0, color='#FF6B6B'),
-                fillcolor='rgba(255, 107, 107, 0.7)',
-                hovertemplate='%{x}<br>Exceptional: %{y:.2f}€<extra></extra>'
-            ))
-        
-        fig.update_layout(
-            title="Monthly Expense Evolution",
-            xaxis_title="Month",
-            yaxis_title="Amount (€)",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            hovermode='x unified',
-            margin=dict(t=60, b=40, l=40, r=40)
-        )
-        
-        return fig
-
-    @app.callback(
-        Output('timeseries-stats', 'children'),
-        [Input('main-tabs', 'value'),
-         Input('refresh-visualizations-store', 'data')]
-    )
-    def update_timeseries_stats(active_tab, refresh_trigger):
-        """Update timeseries statistics panel"""
+        Both come from the same monthly aggregates: one callback (a single
+        request and data version check) updates them together.
+        """
         if active_tab != 'timeseries-tab':
-            return []
+            return {}, []
         
         # Load all processed data dynamically
         try:
-            main_categories = load_config('main_categories.json')
-            all_data = load_all_processed_data()
-            
-            # Apply main categories to all data
-            if not all_data.empty:
-                all_data['main_category'] = all_data['parsed_tags'].apply(
-                    lambda tags: get_main_category(tags, main_categories)
-                )
-            else:
-                return []
-                
+            data_version = get_data_version()
+            return _build_timeseries_figure(data_version), _build_timeseries_stats(data_version)
         except Exception as e:
-            print(f"Error loading timeseries stats data: {e}")
-            return []
-            
-        # Calculate statistics
-        exceptional, regular, monthly_totals = prepare_timeseries_data(all_data)
-        
-        stats_components = [
-            html.H4("📊 Statistics", className="text-primary mb-3"),
-        ]
-        
-        if not monthly_totals.empty:
-            avg_monthly = monthly_totals['amount_abs'].mean()
-            max_monthly = monthly_totals['amount_abs'].max()
-            min_monthly = monthly_totals['amount_abs'].min()
-            
-            stats_components.extend([
-                html.P(f"📈 Average monthly: {avg_monthly:.2f}€"),
-                html.P(f"🔼 Highest month: {max_monthly:.2f}€"),
-                html.P(f"🔽 Lowest month: {min_monthly:.2f}€"),
-                html.Hr()
-            ])
-        
-        if not exceptional.empty:
-            avg_exceptional = exceptional['amount_abs'].mean()
-            stats_components.append(html.P(f"⚠️ Avg exceptional: {avg_exceptional:.2f}€"))
-        
-        if not regular.empty:
-            avg_regular = regular['amount_abs'].mean()
-            stats_components.append(html.P(f"🔄 Avg regular: {avg_regular:.2f}€"))
-        
-        # Add trend analysis
-        if len(monthly_totals) >= 2:
-            trend = monthly_totals['amount_abs'].iloc[-1] - monthly_totals['amount_abs'].iloc[-2]
-            trend_icon = "📈" if trend > 0 else "📉"
-            trend_word = "increase" if trend > 0 else "decrease"
-            stats_components.extend([
-                html.Hr(),
-                html.P(f"{trend_icon} Last month {trend_word}: {abs(trend):.2f}€")
-            ])
-        
-        return stats_components 
\ No newline at end of file
+            print(f"Error loading timeseries data: {e}")
+            return {}, []
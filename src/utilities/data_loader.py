@@ -1,15 +1,60 @@
 """
 Data loading and processing utilities
 """
+import ast
+import operator
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
 import pandas as pd
 import json
 from typing import List, Dict, Any, Optional
-from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-from .paths import get_config_file, get_processed_file, get_expenses_file
+from .paths import (
+    get_config_file, get_processed_file, get_expenses_file, get_raw_file, get_raw_data_dir,
+    get_expenses_cache_file, get_categorized_cache_file, ensure_dir_exists
+)
+
+# pyarrow is optional: its multi-threaded CSV reader is used when installed
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Part of the key of the on-disk caches: bump it whenever the columns or
+# rows of a cached frame change, so that pickles from older code are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+# Server-side store of the DataFrames being tagged, keyed by the value of the
+# dataframe-store component (see prepare_dataframe_for_store)
+DATAFRAME_STORE_SIZE = 16
+# Intermediate preprocessing columns, not read by any callback nor saved
+STORE_UNUSED_COLUMNS = ['amount_numeric', 'parsed_tags']
+_DATAFRAME_STORE: 'OrderedDict[str, pd.DataFrame]' = OrderedDict()
+# Callbacks run in concurrent threads: guards the store and its LRU order
+_DATAFRAME_STORE_LOCK = threading.Lock()
+
+
+class DataFrameExpiredError(LookupError):
+    """Raised when a dataframe-store key is no longer in the server-side store
+    
+    Keys are lost when the server restarts, when newer DataFrames evict them
+    (see DATAFRAME_STORE_SIZE) or when another worker process handles the
+    request: the file has to be selected again.
+    """
 
 
 def _detect_and_map_columns(columns: List[str]) -> Dict[str, str]:
@@ -109,19 +154,114 @@ def is_month_completed(month: str) -> bool:
 
 
 def parse_tags(tags: Any) -> List[str]:
-    """Parse tags from various formats into a list of strings"""
-    if pd.isna(tags) or not tags:
+    """Parse a serialized tag list into a list of strings
+    
+    Tags are stored as JSON (e.g. '["a", "b"]'); older files used the Python
+    repr (e.g. "['a', 'b']"), which is still accepted.
+    """
+    if not isinstance(tags, str) or not tags.strip():
         return []
-    if isinstance(tags, str) and tags.strip():
+    try:
+        tag_list = json.loads(tags)
+    except ValueError:
         try:
-            tag_list = eval(tags)
-            if isinstance(tag_list, list):
-                return tag_list
-        except:
+            tag_list = ast.literal_eval(tags)
+        except (ValueError, SyntaxError):
             return [t.strip() for t in tags.split(',') if t.strip()]
-    elif isinstance(tags, list):
-        return tags
-    return []
+    return tag_list if isinstance(tag_list, list) else []
+
+
+def serialize_tags(tags: Any) -> str:
+    """Serialize a tag list as JSON for CSV storage"""
+    if not isinstance(tags, (list, tuple)):
+        tags = parse_tags(tags)
+    return json.dumps(list(tags), ensure_ascii=False)
+
+
+def parse_tags_column(tags: pd.Series) -> pd.Series:
+    """Parse a column of serialized tag lists
+    
+    Each distinct string is parsed only once: tag lists repeat a lot across
+    transactions, so the column is mapped through a cache of its unique values.
+    """
+    parsed = {value: parse_tags(value) for value in tags.dropna().unique()}
+    return tags.map(lambda value: parsed.get(value, []))
+
+
+def get_untagged_mask(tags: pd.Series) -> pd.Series:
+    """Get a boolean mask of the rows without any tag
+    
+    An empty tag list is falsy: each list is tested once in C instead of
+    computing its length through the .str accessor, which also infers the
+    type of the whole column first.
+    """
+    return pd.Series(np.fromiter(map(operator.not_, tags), dtype=bool, count=len(tags)), index=tags.index)
+
+
+def _get_files_version(paths) -> tuple:
+    """Get the (mtime_ns, size) of each file, or None for missing files"""
+    version = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+def get_data_version() -> tuple:
+    """Get a key identifying the current content of the expenses and main categories files
+    
+    The key changes whenever one of the files is rewritten, so it can be used
+    to key in-process caches of data derived from them.
+    """
+    return _get_files_version((get_expenses_file(), get_config_file('main_categories.json')))
+
+
+def get_raw_file_version(filename: str) -> tuple:
+    """Get a key identifying the current content of a raw file and of the tagging configuration
+    
+    Same as get_data_version, for what preprocess_raw_file reads: the raw
+    file, tags.json and vendor_tags.json.
+    """
+    return _get_files_version((
+        get_raw_file(filename), get_config_file('tags.json'), get_config_file('vendor_tags.json')
+    ))
+
+
+def _read_cache(cache_file: Path, cache_key: tuple) -> Optional[pd.DataFrame]:
+    """Read a DataFrame pickled by _write_cache, or None if missing or stale"""
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, cached_df = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: ignoring unreadable cache {cache_file.name}: {e}")
+        return None
+    return cached_df if cached_key == cache_key else None
+
+
+def _write_cache(cache_file: Path, cache_key: tuple, df: pd.DataFrame) -> None:
+    """Pickle a DataFrame with the key it is valid for
+    
+    The pickle is written to its own temporary file, then swapped in: the
+    startup preload and the callbacks never read a half-written cache.
+    """
+    tmp_path = None
+    try:
+        ensure_dir_exists(cache_file.parent)
+        with tempfile.NamedTemporaryFile(
+            'wb', dir=cache_file.parent, prefix=cache_file.name + '.', suffix='.tmp', delete=False
+        ) as f:
+            tmp_path = f.name
+            pickle.dump((cache_key, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_file)
+    except Exception as e:
+        print(f"Warning: could not write cache {cache_file.name}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def load_all_expenses() -> pd.DataFrame:
@@ -132,14 +272,30 @@ def load_all_expenses() -> pd.DataFrame:
         print(f"Warning: {expenses_file} does not exist")
         return pd.DataFrame()
     
-    df = pd.read_csv(expenses_file)
-    df['parsed_tags'] = df['tags'].apply(parse_tags)
-    df['amount_numeric'] = pd.to_numeric(df['Amount'], errors='coerce')
-    
-    # Only keep expenses (negative amounts)
-    expenses_df = df[df['amount_numeric'] < 0].copy()
-    expenses_df['amount_abs'] = expenses_df['amount_numeric'].abs()
-    
+    # Parsed frame is cached on disk until expenses.csv or its format changes
+    stat = expenses_file.stat()
+    cache_key = (CACHE_FORMAT_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_file = get_expenses_cache_file()
+    cached_df = _read_cache(cache_file, cache_key)
+    if cached_df is not None:
+        return cached_df
+    
+    df = pd.read_csv(expenses_file, engine=CSV_ENGINE)
+    amount_numeric = pd.to_numeric(df['Amount'], errors='coerce')
+    
+    # Only keep expenses (negative amounts), before any per-row work
+    is_expense = amount_numeric < 0
+    expenses_df = df[is_expense].copy()
+    # Amounts are known to be negative: a plain negation gives the absolute value
+    expenses_df['amount_abs'] = -amount_numeric[is_expense]
+    # Integer cents: groupby sums on money are exact (divide by 100 for display)
+    expenses_df['amount_cents'] = (expenses_df['amount_abs'] * 100).round().astype('int32')
+    expenses_df['parsed_tags'] = parse_tags_column(expenses_df['tags'])
+    
+    # Low-cardinality column: group and filter on integer codes
+    expenses_df['month'] = expenses_df['month'].astype('category')
+    
+    _write_cache(cache_file, cache_key, expenses_df)
     return expenses_df
 
 
@@ -156,7 +312,8 @@ def get_month_data(month: str) -> pd.DataFrame:
     if df.empty:
         return df
     
-    return df[df['month'] == month].copy()
+    # Boolean indexing already returns a new DataFrame
+    return df[df['month'] == month]
 
 
 def get_available_months() -> List[str]:
@@ -165,11 +322,13 @@ def get_available_months() -> List[str]:
     Returns:
         List of months in format YYYY-MM, sorted in reverse chronological order
     """
+    # The parsed frame is cached and its month column is categorical: the
+    # months are read from its categories without scanning the rows
     df = load_all_expenses()
     if df.empty:
         return []
     
-    return sorted(df['month'].unique().tolist(), reverse=True)
+    return sorted(df['month'].cat.categories.tolist(), reverse=True)
 
 
 def get_latest_month() -> Optional[str]:
@@ -229,89 +388,265 @@ def get_main_category(tags: List[str], main_categories: List[str]) -> str:
     return 'Autre' if tags else 'Sans tag'
 
 
+def get_main_categories(parsed_tags: pd.Series, main_categories: List[str]) -> pd.Series:
+    """Determine the main category of every row of a parsed tags column
+    
+    Vectorized equivalent of get_main_category: tags are exploded and encoded
+    as ordered categoricals so that the first main category of each row (in
+    main_categories priority order) is a min over that row's slice of the flat
+    code array, computed for all rows at once with np.minimum.reduceat.
+    The result is a categorical Series over main_categories + ['Autre', 'Sans tag'].
+    """
+    categories = list(dict.fromkeys(main_categories))
+    result_categories = list(dict.fromkeys(categories + ['Autre', 'Sans tag']))
+    lengths = parsed_tags.map(len).to_numpy(dtype=np.int64)
+    
+    # explode() keeps one (NaN) row for empty lists: every row owns at least one slot
+    offsets = np.concatenate(([0], np.cumsum(np.maximum(lengths, 1))[:-1]))
+    codes = pd.Categorical(parsed_tags.explode().to_numpy(), categories=categories).codes
+    
+    # Non main tags get a code past the last category so they never win the min
+    no_match = len(categories)
+    codes = np.where(codes >= 0, codes, no_match)
+    if len(parsed_tags):
+        first_codes = np.minimum.reduceat(codes, offsets)
+    else:
+        first_codes = codes
+    first_codes = np.where(first_codes < no_match, first_codes, -1)
+    
+    fallback = np.where(
+        lengths > 0, result_categories.index('Autre'), result_categories.index('Sans tag')
+    )
+    result_codes = np.where(first_codes >= 0, first_codes, fallback)
+    return pd.Series(
+        pd.Categorical.from_codes(result_codes, categories=result_categories),
+        index=parsed_tags.index
+    )
+
+
+_CATEGORIZED_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=2)
+def _load_categorized_expenses(data_version: tuple) -> pd.DataFrame:
+    # Only the projected frame is read back on restart, not the full expenses
+    cache_file = get_categorized_cache_file()
+    cache_key = (CACHE_FORMAT_VERSION, data_version)
+    cached_df = _read_cache(cache_file, cache_key)
+    if cached_df is not None:
+        return cached_df
+    
+    main_categories = load_config('main_categories.json')
+    all_data = load_all_expenses()
+    if all_data.empty:
+        return all_data
+    
+    # Only keep what the dashboard aggregations read: month (categorical),
+    # tags and int32 cents. Rows are sorted by month (stable) so that a month
+    # is a contiguous slice. Rows without a month are dropped first: their -1
+    # code would break the binary search on the sorted codes
+    all_data = all_data.loc[all_data['month'].notna(), ['month', 'tags', 'parsed_tags', 'amount_cents']]
+    all_data = all_data.sort_values('month', kind='stable')
+    all_data = all_data.reset_index(drop=True)
+    
+    # Tag lists repeat a lot: resolve the main category of each distinct list
+    # once, then broadcast it to the rows with its factorized codes
+    tag_codes, _ = pd.factorize(all_data.pop('tags'), use_na_sentinel=False)
+    first_rows = np.unique(tag_codes, return_index=True)[1]
+    unique_categories = get_main_categories(all_data['parsed_tags'].iloc[first_rows], main_categories)
+    all_data['main_category'] = pd.Categorical.from_codes(
+        unique_categories.cat.codes.to_numpy()[tag_codes], dtype=unique_categories.dtype
+    )
+    _write_cache(cache_file, cache_key, all_data)
+    return all_data
+
+
+def load_categorized_expenses() -> pd.DataFrame:
+    """Load all expenses with their main category
+    
+    Only the month, parsed_tags, amount_cents and main_category columns are
+    kept, sorted by month (see get_month_slices). Cached until expenses.csv
+    or main_categories.json change (see get_data_version): the returned
+    DataFrame is shared between callers and must not be modified.
+    """
+    # Concurrent callbacks (and the startup preload) wait for a single load
+    with _CATEGORIZED_LOCK:
+        return _load_categorized_expenses(get_data_version())
+
+
+def get_month_slices(all_data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Split a DataFrame sorted by its categorical month column into one slice per month
+    
+    The bounds of every month come from a single binary search over all the
+    category codes, so the slices are views built without scanning the rows.
+    """
+    months = all_data['month'].cat.categories
+    bounds = np.searchsorted(all_data['month'].cat.codes.to_numpy(), np.arange(len(months) + 1))
+    return {
+        month: all_data.iloc[start:end]
+        for month, start, end in zip(months, bounds[:-1], bounds[1:])
+    }
+
+
 def get_subtags_for_category(category_name: str, month_data: pd.DataFrame) -> Dict[str, float]:
-    """Get subtags and their amounts for a given category"""
+    """Get subtags and their amounts for a given category
+    
+    Subtags are sorted by decreasing amount (ties keep their first-seen order).
+    """
     if category_name in ['Sans tag', 'Autre']:
         return {}
     
-    # Filter transactions for this category
-    category_transactions = month_data[month_data['main_category'] == category_name]
+    # Filter transactions for this category, one row per tag
+    category_transactions = month_data.loc[month_data['main_category'] == category_name, ['parsed_tags', 'amount_cents']]
+    tag_rows = category_transactions.explode('parsed_tags')
     
-    # Count amounts by subtag (excluding the main tag)
-    subtag_amounts = defaultdict(float)
+    # Sum amounts by subtag (excluding the main tag), on integer subtag ids
+    tag_rows = tag_rows[tag_rows['parsed_tags'] != category_name].dropna()
+    subtag_ids, subtag_names = pd.factorize(tag_rows['parsed_tags'])
+    subtag_amounts = np.bincount(subtag_ids, weights=tag_rows['amount_cents'].to_numpy(), minlength=len(subtag_names))
     
-    for _, row in category_transactions.iterrows():
-        tags = row['parsed_tags']
-        amount = row['amount_abs']
-        
-        # Add all tags EXCEPT the main tag
-        for tag in tags:
-            if tag != category_name:
-                subtag_amounts[tag] += amount
+    order = np.argsort(-subtag_amounts, kind='stable')
+    return dict(zip(subtag_names[order].tolist(), (subtag_amounts[order] / 100).tolist()))
+
+
+def get_subtags_by_category(month_data: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Get the subtags of every category in one pass over the month
+    
+    Same dicts as get_subtags_for_category, keyed by category name; categories
+    without subtags are left out.
+    """
+    tag_rows = month_data[['main_category', 'parsed_tags', 'amount_cents']].explode('parsed_tags').dropna()
+    
+    # Exclude the main tag itself and the fallback categories
+    is_subtag = tag_rows['parsed_tags'].to_numpy() != tag_rows['main_category'].astype(object).to_numpy()
+    tag_rows = tag_rows[is_subtag & ~tag_rows['main_category'].isin(['Sans tag', 'Autre'])]
     
-    return dict(sorted(subtag_amounts.items(), key=lambda x: x[1], reverse=True))
+    # sort=False keeps subtags in first-seen order within each category, for ties
+    subtag_cents = tag_rows.groupby(['main_category', 'parsed_tags'], sort=False, observed=True)['amount_cents'].sum()
+    return {
+        category: (amounts.droplevel('main_category').sort_values(ascending=False, kind='stable') / 100).to_dict()
+        for category, amounts in subtag_cents.groupby(level='main_category', sort=False, observed=True)
+    }
 
 
 def get_monthly_trend(category_name: str, all_data: pd.DataFrame) -> pd.DataFrame:
     """Get monthly evolution for a category"""
-    monthly_data = all_data[all_data['main_category'] == category_name].groupby('month')['amount_abs'].sum().reset_index()
+    monthly_cents = all_data[all_data['main_category'] == category_name].groupby('month', observed=True)['amount_cents'].sum()
+    monthly_data = (monthly_cents / 100).rename('amount_abs').reset_index()
     return monthly_data
 
 
+def get_monthly_trends(all_data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Get the monthly evolution of every category in one groupby
+    
+    Same frames as get_monthly_trend, keyed by category name.
+    """
+    monthly_cents = all_data.groupby(['main_category', 'month'], observed=True)['amount_cents'].sum()
+    return {
+        category: (monthly.droplevel('main_category') / 100).rename('amount_abs').reset_index()
+        for category, monthly in monthly_cents.groupby(level='main_category', observed=True)
+    }
+
+
 def prepare_timeseries_data(all_data: pd.DataFrame) -> tuple:
     """Prepare data for timeseries analysis"""
-    # Group by month and expense type (exceptional vs others)
-    all_data_copy = all_data.copy()
-    all_data_copy['is_exceptional'] = all_data_copy['main_category'] == 'exceptionnel'
-    
-    monthly_summary = all_data_copy.groupby(['month', 'is_exceptional'])['amount_abs'].sum().reset_index()
+    # Group by month and expense type (exceptional vs others), in one pass over the data
+    is_exceptional = (all_data['main_category'] == 'exceptionnel').rename('is_exceptional')
+    monthly_cents = all_data.groupby([all_data['month'], is_exceptional], observed=True)['amount_cents'].sum()
+    monthly_summary = (monthly_cents / 100).rename('amount_abs').reset_index()
     
     # Separate exceptional and regular expenses
-    exceptional = monthly_summary[monthly_summary['is_exceptional']].copy()
-    regular = monthly_summary[~monthly_summary['is_exceptional']].copy()
+    exceptional = monthly_summary[monthly_summary['is_exceptional']]
+    regular = monthly_summary[~monthly_summary['is_exceptional']]
     
-    # Calculate monthly totals
-    monthly_totals = all_data_copy.groupby('month')['amount_abs'].sum().reset_index()
+    # Calculate monthly totals from the per-type sums
+    monthly_totals = monthly_cents.groupby(level='month', observed=True).sum()
+    monthly_totals = (monthly_totals / 100).rename('amount_abs').reset_index()
     
     return exceptional, regular, monthly_totals
 
 
+# Raw files read at the same time when listing them
+RAW_FILES_WORKERS = 8
+
+
+@lru_cache(maxsize=64)
+def _get_raw_file_contents_info(path: str, modified_ns: int, size: int) -> tuple:
+    """Get (num_rows, columns, error) of a raw CSV file
+    
+    Cached per file modification time and size: the file is only parsed
+    again once it has been rewritten.
+    """
+    try:
+        df = pd.read_csv(path)
+        return len(df), tuple(df.columns), None
+    except Exception as e:
+        return 0, (), str(e)
+
+
+def _get_raw_file_info(csv_entry: os.DirEntry) -> Optional[Dict[str, Any]]:
+    """Get the file info of a raw CSV file, or None if it can't be read"""
+    try:
+        # Get file info
+        stat = csv_entry.stat()
+        file_info = {
+            'filename': csv_entry.name,
+            'path': csv_entry.path,
+            'size': stat.st_size,
+            'modified': stat.st_mtime
+        }
+        
+        # Try to get basic CSV info
+        num_rows, columns, error = _get_raw_file_contents_info(csv_entry.path, stat.st_mtime_ns, stat.st_size)
+        file_info['num_rows'] = num_rows
+        file_info['columns'] = list(columns)
+        file_info['readable'] = error is None
+        if error is not None:
+            file_info['error'] = error
+        
+        return file_info
+    except Exception as e:
+        print(f"Error processing {csv_entry.path}: {e}")
+        return None
+
+
+def get_raw_files_signature() -> tuple:
+    """Get a key identifying the raw CSV files and their content
+    
+    Sorted (filename, mtime_ns, size) tuples from one directory pass: the key
+    changes whenever a raw file is added, removed or rewritten.
+    """
+    raw_dir = get_raw_data_dir()
+    
+    if not raw_dir.exists():
+        return ()
+    
+    signature = []
+    with os.scandir(raw_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.csv'):
+                stat = entry.stat()
+                signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(signature))
+
+
 def get_raw_files() -> List[Dict[str, Any]]:
     """Get list of raw data files available for tagging"""
-    from .paths import get_raw_data_dir
     raw_dir = get_raw_data_dir()
     
     if not raw_dir.exists():
         return []
     
-    csv_files = list(raw_dir.glob("*.csv"))
+    # One directory pass: scandir entries carry their stat information
+    with os.scandir(raw_dir) as entries:
+        csv_entries = [entry for entry in entries if entry.name.endswith('.csv')]
     
-    raw_files = []
-    for csv_file in csv_files:
-        try:
-            # Get file info
-            file_info = {
-                'filename': csv_file.name,
-                'path': str(csv_file),
-                'size': csv_file.stat().st_size,
-                'modified': csv_file.stat().st_mtime
-            }
-            
-            # Try to get basic CSV info
-            try:
-                df = pd.read_csv(csv_file)
-                file_info['num_rows'] = len(df)
-                file_info['columns'] = list(df.columns)
-                file_info['readable'] = True
-            except Exception as e:
-                file_info['num_rows'] = 0
-                file_info['columns'] = []
-                file_info['readable'] = False
-                file_info['error'] = str(e)
-            
-            raw_files.append(file_info)
-        except Exception as e:
-            print(f"Error processing {csv_file}: {e}")
+    if not csv_entries:
+        return []
+    
+    # Files that changed are parsed in parallel: reading releases the GIL
+    with ThreadPoolExecutor(max_workers=min(RAW_FILES_WORKERS, len(csv_entries))) as executor:
+        raw_files = [info for info in executor.map(_get_raw_file_info, csv_entries) if info is not None]
     
     # Sort by modification time (newest first)
     raw_files.sort(key=lambda x: x['modified'], reverse=True)
@@ -343,15 +678,38 @@ def load_tagging_configs() -> tuple:
 
 
 def save_json_config(filename: str, data: dict) -> bool:
-    """Save configuration data to JSON file"""
+    """Save configuration data to JSON file
+    
+    The JSON is serialized in memory and written in one go to a temporary
+    file, then swapped in: a failed write never leaves a truncated
+    configuration behind. Each save gets its own temporary file, so
+    concurrent saves of the same configuration don't overwrite each other's.
+    The temporary file is created private (0600): it gets the permissions of
+    the configuration it replaces, or the default ones for a new file.
+    """
+    tmp_path = None
     try:
         from .paths import get_config_file
         config_path = get_config_file(filename)
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        content = json.dumps(data, ensure_ascii=False, indent=2)
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=config_path.parent, prefix=config_path.name + '.',
+            suffix='.tmp', delete=False
+        ) as f:
+            tmp_path = f.name
+            f.write(content)
+        if config_path.exists():
+            shutil.copymode(config_path, tmp_path)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, config_path)
         return True
     except Exception as e:
         print(f"Error saving {filename}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
 
@@ -418,9 +776,9 @@ def preprocess_raw_file(filename: str) -> tuple:
     """
     from .paths import get_raw_file
     
-    # Load raw file
+    # Load raw file (multi-threaded pyarrow reader when available)
     file_path = get_raw_file(filename)
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, engine=CSV_ENGINE)
     
     # Step 1: Detect language and map columns
     column_mapping = _detect_and_map_columns(df.columns)
@@ -439,15 +797,15 @@ def preprocess_raw_file(filename: str) -> tuple:
     # Step 3: Sort by date (chronological order) - more logical for tagging
     df = df.sort_values(by='Date', ascending=True)
     
-    # Step 4: Initialize tags column
-    df["tags"] = [[] for _ in range(len(df))]
-    
-    # Step 5: Convert Amount to numeric and filter for expenses only
+    # Step 4: Convert Amount to numeric and filter for expenses only
     df['amount_numeric'] = pd.to_numeric(df['Amount'], errors='coerce')
     expenses_df = df[df['amount_numeric'] < 0].copy()
     
-    # Step 6: Add absolute amount for display
-    expenses_df['amount_abs'] = expenses_df['amount_numeric'].abs()
+    # Step 5: Initialize tags column (expenses only: one new list per row)
+    expenses_df.insert(expenses_df.columns.get_loc('amount_numeric'), 'tags', [[] for _ in range(len(expenses_df))])
+    
+    # Step 6: Add absolute amount for display (amounts are negative here)
+    expenses_df['amount_abs'] = -expenses_df['amount_numeric']
     
     # Step 7: Load tagging configurations
     tags, vendor_tags = load_tagging_configs()
@@ -658,12 +1016,9 @@ def spread_transaction_over_months(transaction: pd.Series, start_month: str, end
                 new_trans['tags'] = tags_value.copy()
             elif pd.notna(tags_value) and tags_value:
                 # Try to parse if it's a string representation
-                try:
-                    if isinstance(tags_value, str):
-                        new_trans['tags'] = eval(tags_value) if tags_value.startswith('[') else []
-                    else:
-                        new_trans['tags'] = []
-                except:
+                if isinstance(tags_value, str) and tags_value.startswith('['):
+                    new_trans['tags'] = parse_tags(tags_value)
+                else:
                     new_trans['tags'] = []
             else:
                 new_trans['tags'] = []
@@ -696,7 +1051,7 @@ def analyze_untagged_vendors(df: pd.DataFrame, vendor_tags: dict) -> dict:
     Following the notebook logic
     """
     # All vendors are untagged (tags column is empty lists)
-    mask = df["tags"].apply(lambda tags: len(tags) == 0)
+    mask = get_untagged_mask(df["tags"])
     untagged = df[mask]
     
     if len(untagged) == 0:
@@ -706,17 +1061,18 @@ def analyze_untagged_vendors(df: pd.DataFrame, vendor_tags: dict) -> dict:
             'unknown_vendors': []
         }
     
-    known_vendors = set(vendor_tags.keys())
-    
     # Group by vendor and sum amounts
-    vendor_amounts = untagged.groupby("Description")["amount_abs"].sum().sort_values(ascending=False)
+    vendor_amounts = untagged.groupby("Description", observed=True)["amount_abs"].sum().sort_values(ascending=False)
+    
+    # Look up every vendor in the configuration at once
+    is_known = vendor_amounts.index.isin(list(vendor_tags))
     
     # Separate known and unknown vendors
     known_merchants = []
     unknown_merchants = []
     
-    for vendor, amount in vendor_amounts.items():
-        if vendor in known_vendors:
+    for (vendor, amount), known in zip(vendor_amounts.items(), is_known):
+        if known:
             known_merchants.append({
                 'name': vendor,
                 'display_name': f"🟢 {vendor}",
@@ -744,20 +1100,21 @@ def analyze_untagged_vendors(df: pd.DataFrame, vendor_tags: dict) -> dict:
 def get_untagged_vendors_from_df(df: pd.DataFrame, vendor_tags: dict) -> List[Dict]:
     """Get list of untagged vendors from current DataFrame state"""
     # Filter untagged transactions
-    mask = df["tags"].apply(lambda tags: len(tags) == 0)
+    mask = get_untagged_mask(df["tags"])
     untagged = df[mask]
     
     if len(untagged) == 0:
         return []
     
-    known_vendors = set(vendor_tags.keys())
-    
     # Group by vendor and sum amounts
-    vendor_amounts = untagged.groupby("Description")["amount_abs"].sum().sort_values(ascending=False)
+    vendor_amounts = untagged.groupby("Description", observed=True)["amount_abs"].sum().sort_values(ascending=False)
+    
+    # Look up every vendor in the configuration at once
+    is_known = vendor_amounts.index.isin(list(vendor_tags))
     
     vendors_list = []
-    for vendor, amount in vendor_amounts.items():
-        if vendor in known_vendors:
+    for (vendor, amount), known in zip(vendor_amounts.items(), is_known):
+        if known:
             vendors_list.append({
                 'label': f"🟢 {vendor} ({amount:.2f}€)",
                 'value': vendor
@@ -771,23 +1128,29 @@ def get_untagged_vendors_from_df(df: pd.DataFrame, vendor_tags: dict) -> List[Di
     return vendors_list
 
 
+@lru_cache(maxsize=8)
+def _sort_tags_by_frequency(tag_counts: tuple) -> tuple:
+    """Sort (tag, count) pairs by decreasing count, cached per tags configuration"""
+    return tuple(tag for tag, _ in sorted(tag_counts, key=lambda x: x[1], reverse=True))
+
+
 def get_suggested_tags_for_vendors(selected_vendors: List[str], tags: dict, vendor_tags: dict) -> List[Dict]:
     """Get suggested tags for selected vendors"""
+    # The tags configuration only changes when tags are applied: sorted once per version
+    sorted_tags = _sort_tags_by_frequency(tuple(tags.items()))
+    
     if not selected_vendors:
         # Return all tags sorted by frequency
-        all_tags = [{'label': tag, 'value': tag} for tag, _ in sorted(tags.items(), key=lambda x: x[1], reverse=True)]
-        return all_tags
+        return [{'label': tag, 'value': tag} for tag in sorted_tags]
     
-    # Get suggested tags for selected vendors
-    suggested_tags = set()
-    for vendor in selected_vendors:
-        if vendor in vendor_tags:
-            suggested_tags.update(vendor_tags[vendor].keys())
+    # Get suggested tags for selected vendors, deduplicated in the vendors' order
+    suggested_tags = dict.fromkeys(chain.from_iterable(
+        vendor_tags[vendor] for vendor in selected_vendors if vendor in vendor_tags
+    ))
     
     # Sort tags: suggested first (with star), then others
     suggested_list = [{'label': f"⭐ {tag}", 'value': tag} for tag in suggested_tags]
-    other_tags = [{'label': tag, 'value': tag} for tag in tags.keys() if tag not in suggested_tags]
-    other_tags.sort(key=lambda x: tags.get(x['value'], 0), reverse=True)
+    other_tags = [{'label': tag, 'value': tag} for tag in sorted_tags if tag not in suggested_tags]
     
     return suggested_list + other_tags
 
@@ -797,18 +1160,17 @@ def get_transaction_details_for_vendors(df: pd.DataFrame, selected_vendors: List
     if not selected_vendors:
         return {'transactions': [], 'summary': {}}
     
-    # Filter untagged transactions for selected vendors
-    mask_untagged = df["tags"].apply(lambda tags: len(tags) == 0)
-    mask_vendors = df["Description"].isin(selected_vendors)
-    transactions = df[mask_untagged & mask_vendors]
+    # Filter the selected vendors first (isin on the categorical codes), then
+    # only check the tags of their rows
+    vendor_rows = df[df["Description"].isin(selected_vendors)]
+    transactions = vendor_rows.loc[get_untagged_mask(vendor_rows["tags"]), ['Description', 'amount_abs', 'Date']]
     
     if len(transactions) == 0:
         return {'transactions': [], 'summary': {}}
     
     # Sort transactions chronologically (oldest first for better memory context)
     # Convert Date to datetime for proper sorting, then sort by date AND amount as secondary key
-    transactions_with_datetime = transactions.copy()
-    transactions_with_datetime['Date'] = pd.to_datetime(transactions_with_datetime['Date'])
+    transactions_with_datetime = transactions.assign(Date=pd.to_datetime(transactions['Date']))
     # Sort by date first (oldest first), then by amount (descending) as secondary sort
     transactions_sorted = transactions_with_datetime.sort_values(['Date', 'amount_abs'], ascending=[True, False])
     
@@ -816,17 +1178,24 @@ def get_transaction_details_for_vendors(df: pd.DataFrame, selected_vendors: List
     transactions_list = []
     vendor_summary = {}
     
-    for idx, (df_idx, trans) in enumerate(transactions_sorted.iterrows()):
-        vendor = trans["Description"]
+    # Only the needed columns, as plain tuples (no Series per row); dates are formatted in one pass
+    rows = zip(
+        transactions_sorted.index,
+        transactions_sorted["Description"].astype(object),
+        transactions_sorted["amount_abs"].tolist(),
+        transactions_sorted["Date"],
+        transactions_sorted["Date"].dt.strftime('%Y-%m-%d')
+    )
+    for df_idx, vendor, amount, date, display_date in rows:
         transaction_info = {
             'id': f"trans_{df_idx}",  # Unique ID based on DataFrame index
             'df_index': df_idx,  # Original DataFrame index for targeting
             'vendor': vendor,
-            'amount': trans["amount_abs"],
-            'date': str(trans["Date"]),
-            'description': trans["Description"],
-            'display_date': trans["Date"].strftime('%Y-%m-%d') if isinstance(trans["Date"], pd.Timestamp) else pd.to_datetime(trans["Date"]).strftime('%Y-%m-%d'),
-            'display_amount': f"{trans['amount_abs']:.2f}€"
+            'amount': amount,
+            'date': str(date),
+            'description': vendor,
+            'display_date': display_date,
+            'display_amount': f"{amount:.2f}€"
         }
         transactions_list.append(transaction_info)
         
@@ -837,7 +1206,7 @@ def get_transaction_details_for_vendors(df: pd.DataFrame, selected_vendors: List
                 'count': 0,
                 'transactions': []
             }
-        vendor_summary[vendor]['total'] += trans["amount_abs"]
+        vendor_summary[vendor]['total'] += amount
         vendor_summary[vendor]['count'] += 1
         vendor_summary[vendor]['transactions'].append(transaction_info)
     
@@ -852,10 +1221,11 @@ def apply_tags_to_vendors(df: pd.DataFrame, selected_vendors: List[str], selecte
     if not selected_vendors or (not (selected_tags or []) and not new_tags):
         return df, 0
     
-    all_tags = list(set((selected_tags or []) + new_tags))
+    # Order-preserving dedupe: tags are stored in the order they were picked
+    all_tags = list(dict.fromkeys(chain(selected_tags or (), new_tags)))
     
     # Find indices of untagged transactions for the selected vendors
-    mask_untagged = df["tags"].apply(lambda tags: len(tags) == 0)
+    mask_untagged = get_untagged_mask(df["tags"])
     mask_vendors = df["Description"].isin(selected_vendors)
     indices_to_update = df[mask_untagged & mask_vendors].index
     
@@ -892,7 +1262,7 @@ def apply_tags_to_transaction(df: pd.DataFrame, transaction_id: str, selected_ta
         return df, 0  # Already tagged
     
     # Combine selected tags and new tags
-    all_tags = list(set(selected_tags + new_tags))
+    all_tags = list(dict.fromkeys(chain(selected_tags, new_tags)))
     
     # Apply tags to the specific transaction
     df.at[df_index, "tags"] = all_tags
@@ -935,14 +1305,14 @@ def get_daily_context_for_transaction(df: pd.DataFrame, transaction_id: str) ->
             return {'transactions': [], 'summary': {}}
         
         # Get the date of the selected transaction
-        selected_datetime = pd.to_datetime(df.loc[df_index, 'Date'])
+        dates = pd.to_datetime(df['Date'])
+        selected_datetime = dates.loc[df_index]
         selected_date = selected_datetime.date()
         
-        # Find all transactions from the same day (convert dates for comparison)
-        df_with_dates = df.copy()
-        df_with_dates['Date'] = pd.to_datetime(df_with_dates['Date'])
-        same_day_mask = df_with_dates['Date'].dt.date == selected_date
-        same_day_transactions = df_with_dates[same_day_mask].copy()
+        # Find all transactions from the same day: compare the datetimes truncated
+        # to the day, without copying the DataFrame or building date objects per row
+        same_day_mask = dates.dt.normalize() == selected_datetime.normalize()
+        same_day_transactions = df.loc[same_day_mask, ['Description', 'amount_abs', 'tags']].assign(Date=dates[same_day_mask])
         
         # Sort by time (chronological order within the day)
         same_day_transactions = same_day_transactions.sort_values('Date', ascending=True)
@@ -950,22 +1320,28 @@ def get_daily_context_for_transaction(df: pd.DataFrame, transaction_id: str) ->
         # Format transactions for display
         transactions_list = []
         total_amount = 0
+        tagged_count = 0
         
-        for idx, (df_idx, trans) in enumerate(same_day_transactions.iterrows()):
+        rows = zip(
+            same_day_transactions.index,
+            same_day_transactions['Description'].astype(object),
+            same_day_transactions['amount_abs'].tolist(),
+            same_day_transactions['tags'],
+            same_day_transactions['Date']
+        )
+        for df_idx, vendor, amount, tags, trans_datetime in rows:
             is_selected = df_idx == df_index
-            tags = trans.get('tags', [])
             has_tags = len(tags) > 0 if isinstance(tags, list) else False
             
             # Extract time information
-            trans_datetime = pd.to_datetime(trans['Date'])
             has_time = trans_datetime.time() != pd.Timestamp('00:00:00').time()
             
             transaction_info = {
                 'id': f"trans_{df_idx}",
                 'df_index': df_idx,
-                'vendor': trans['Description'],
-                'amount': trans['amount_abs'],
-                'display_amount': f"{trans['amount_abs']:.2f}€",
+                'vendor': vendor,
+                'amount': amount,
+                'display_amount': f"{amount:.2f}€",
                 'datetime': trans_datetime,
                 'time': trans_datetime.strftime('%H:%M') if has_time else 'N/A',
                 'has_time': has_time,
@@ -975,7 +1351,8 @@ def get_daily_context_for_transaction(df: pd.DataFrame, transaction_id: str) ->
                 'tags_display': ', '.join(tags) if has_tags else 'No tags'
             }
             transactions_list.append(transaction_info)
-            total_amount += trans['amount_abs']
+            total_amount += amount
+            tagged_count += has_tags
         
         # Create summary
         summary = {
@@ -983,8 +1360,8 @@ def get_daily_context_for_transaction(df: pd.DataFrame, transaction_id: str) ->
             'date_display': selected_date.strftime('%A, %B %d, %Y'),
             'total_amount': total_amount,
             'total_transactions': len(transactions_list),
-            'tagged_transactions': sum(1 for t in transactions_list if t['has_tags']),
-            'untagged_transactions': sum(1 for t in transactions_list if not t['has_tags'])
+            'tagged_transactions': tagged_count,
+            'untagged_transactions': len(transactions_list) - tagged_count
         }
         
         return {
@@ -996,48 +1373,107 @@ def get_daily_context_for_transaction(df: pd.DataFrame, transaction_id: str) ->
         return {'transactions': [], 'summary': {}}
 
 
-def restore_dataframe_from_store(df_data: list) -> pd.DataFrame:
-    """Restore DataFrame from store data, ensuring all columns are properly converted
+def restore_dataframe_from_store(df_data: Optional[str], copy: bool = True) -> pd.DataFrame:
+    """Restore DataFrame from store data
     
-    This function:
-    1. Converts stored JSON data back to DataFrame
-    2. Restores datetime format for Date column
-    3. Recalculates numeric columns (amount_numeric, amount_abs)
-    4. Ensures data consistency after modifications
+    The store holds a key from prepare_dataframe_for_store: the DataFrame is
+    taken from the server-side store as is, without going through JSON. Its
+    columns were already converted when it was stored (see
+    _normalize_store_dataframe).
     
     Args:
-        df_data (list): List of dictionaries from Dash store
+        df_data (str): Store key from the Dash store
+        copy (bool): Return a copy of the stored DataFrame. Callbacks that only
+            read it pass False to skip the copy and must not modify it
         
     Returns:
         pd.DataFrame: Restored DataFrame with all columns properly typed
+    
+    Raises:
+        DataFrameExpiredError: If the key is no longer in the server-side store
     """
     if not df_data:
         return pd.DataFrame()
     
-    # Convert dict back to DataFrame
-    df = pd.DataFrame(df_data)
+    with _DATAFRAME_STORE_LOCK:
+        df = _DATAFRAME_STORE.get(df_data)
+        if df is None:
+            raise DataFrameExpiredError(f"DataFrame {df_data} is no longer in the store")
+        _DATAFRAME_STORE.move_to_end(df_data)
+    # Callbacks may modify the DataFrame: the stored one must stay as is
+    return df.copy() if copy else df
+
+
+def _normalize_store_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Give a DataFrame the column types callbacks expect from the store
     
+    Called once when a DataFrame enters the server-side store: columns that
+    already have the expected dtype are left as they are.
+    """
     # Ensure Date column is datetime with time information
-    if 'Date' in df.columns:
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
         df['Date'] = pd.to_datetime(df['Date'])
     
-    # Recalculate numeric columns
+    # Ensure tags are lists
+    if 'tags' in df.columns:
+        df['tags'] = df['tags'].map(lambda tags: parse_tags(tags) if isinstance(tags, str) else tags)
+    
+    # Recalculate the absolute amount
     if 'Amount' in df.columns:
-        df['amount_numeric'] = pd.to_numeric(df['Amount'], errors='coerce')
-        df['amount_abs'] = df['amount_numeric'].abs()
+        df['amount_abs'] = pd.to_numeric(df['Amount'], errors='coerce').abs()
+    
+    # Vendors repeat a lot: group and filter them on integer codes
+    if 'Description' in df.columns and not isinstance(df['Description'].dtype, pd.CategoricalDtype):
+        df['Description'] = df['Description'].astype('category')
+    
+    # Columns no callback reads are not kept in the store
+    return df.drop(columns=STORE_UNUSED_COLUMNS, errors='ignore')
+
+
+def prepare_dataframe_for_store(df: pd.DataFrame) -> Optional[str]:
+    """Prepare DataFrame for storage in Dash store
+    
+    The DataFrame is kept in a server-side store and only its key goes to
+    the browser, so callbacks don't serialize and rebuild every row through
+    JSON on each interaction (see restore_dataframe_from_store).
+    
+    This function:
+    1. Restores datetime format for Date column
+    2. Ensures tags are properly formatted as lists
+    3. Recalculates amount_abs (amount_numeric is dropped: nothing reads it)
+    4. Resets the index, like a round-trip through records would
+    
+    Args:
+        df (pd.DataFrame): DataFrame to prepare for storage
+        
+    Returns:
+        str: Key of the DataFrame in the server-side store, or None if it is empty
+    """
+    if df.empty:
+        return None
+    
+    key = uuid.uuid4().hex
+    stored_df = _normalize_store_dataframe(df.reset_index(drop=True))
+    
+    with _DATAFRAME_STORE_LOCK:
+        _DATAFRAME_STORE[key] = stored_df
+        # Only recent versions are kept: older keys are no longer in any dcc.Store
+        while len(_DATAFRAME_STORE) > DATAFRAME_STORE_SIZE:
+            _DATAFRAME_STORE.popitem(last=False)
     
-    return df
+    return key
 
 
 def get_tagging_progress(df: pd.DataFrame) -> Dict:
     """Get current tagging progress statistics based on amount"""
     total_transactions = len(df)
-    untagged_mask = df["tags"].apply(lambda tags: len(tags) == 0)
+    untagged_mask = get_untagged_mask(df["tags"])
     
-    # Calculate totals based on amount
-    total_amount = df['amount_abs'].sum()
-    tagged_amount = df[~untagged_mask]['amount_abs'].sum()
-    untagged_amount = df[untagged_mask]['amount_abs'].sum()
+    # Calculate totals based on amount (masking the column, not the whole frame)
+    amount_abs = df['amount_abs']
+    total_amount = amount_abs.sum()
+    tagged_amount = amount_abs[~untagged_mask].sum()
+    untagged_amount = amount_abs[untagged_mask].sum()
     
     # Count transactions (for display)
     untagged_count = untagged_mask.sum()
@@ -1054,44 +1490,6 @@ def get_tagging_progress(df: pd.DataFrame) -> Dict:
     }
 
 
-def prepare_dataframe_for_store(df: pd.DataFrame) -> list:
-    """Prepare DataFrame for storage in Dash store
-    Converts DataFrame to a format suitable for JSON serialization
-    
-    This function:
-    1. Converts DataFrame to dict records for JSON serialization
-    2. Handles datetime conversion to ISO format
-    3. Ensures tags are properly formatted as lists
-    4. Preserves numeric columns (Amount, amount_abs) as numbers
-    
-    Args:
-        df (pd.DataFrame): DataFrame to prepare for storage
-        
-    Returns:
-        list: List of dictionaries ready for JSON serialization and Dash store
-    """
-    if df.empty:
-        return []
-    
-    # Convert DataFrame to dict records
-    df_dict = df.to_dict('records')
-    
-    # Convert any non-serializable objects to strings
-    for record in df_dict:
-        # Convert datetime objects to string
-        if 'Date' in record and pd.notnull(record['Date']):
-            record['Date'] = pd.Timestamp(record['Date']).isoformat()
-        
-        # Convert tags to list if it's a string representation
-        if 'tags' in record and isinstance(record['tags'], str):
-            try:
-                record['tags'] = eval(record['tags'])
-            except:
-                record['tags'] = []
-    
-    return df_dict
-
-
 def save_expenses(df: pd.DataFrame, month: Optional[str] = None) -> Dict[str, Any]:
     """Save expenses to the unified CSV file
     
@@ -1113,9 +1511,9 @@ def save_expenses(df: pd.DataFrame, month: Optional[str] = None) -> Dict[str, An
         # Store original indices for matching
         original_indices = save_df.index.tolist()
         
-        # Convert tags list to string representation for CSV
+        # Convert tags list to JSON for CSV
         if 'tags' in save_df.columns:
-            save_df['tags'] = save_df['tags'].apply(lambda tags: str(tags) if tags else '[]')
+            save_df['tags'] = save_df['tags'].apply(serialize_tags)
         
         # Remove temporary columns
         cols_to_remove = ['amount_numeric', 'amount_abs', 'parsed_tags']
@@ -1139,6 +1537,11 @@ def save_expenses(df: pd.DataFrame, month: Optional[str] = None) -> Dict[str, An
                 # Remove old data for this month
                 existing_df = existing_df[existing_df['month'] != month]
                 
+                # Rewrite legacy Python-repr tags as JSON (once per distinct value)
+                if 'tags' in existing_df.columns:
+                    serialized = {value: serialize_tags(value) for value in existing_df['tags'].dropna().unique()}
+                    existing_df['tags'] = existing_df['tags'].map(serialized)
+                
                 # Combine with new data
                 save_df = pd.concat([existing_df, save_df], ignore_index=True)
                 
@@ -24,6 +24,10 @@ def get_config_dir() -> Path:
     """Get the configuration directory"""
     return get_data_dir() / "config"
 
+def get_cache_dir() -> Path:
+    """Get the cache directory (derived files, safe to delete)"""
+    return get_data_dir() / "cache"
+
 def get_outputs_dir() -> Path:
     """Get the outputs directory"""
     return get_project_root() / "outputs"
@@ -44,6 +48,14 @@ def get_expenses_file() -> Path:
     """Get the unified expenses CSV file path"""
     return get_processed_data_dir() / "expenses.csv"
 
+def get_expenses_cache_file() -> Path:
+    """Get the parsed expenses cache file path"""
+    return get_cache_dir() / "expenses.pkl"
+
+def get_categorized_cache_file() -> Path:
+    """Get the categorized expenses cache file path (dashboard columns only)"""
+    return get_cache_dir() / "categorized.pkl"
+
 def ensure_dir_exists(path: Union[str, Path]) -> Path:
     """Ensure a directory exists, create if it doesn't"""
     path = Path(path)